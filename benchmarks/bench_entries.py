@@ -0,0 +1,99 @@
+"""
+Compare posting mining session entries one by one against one bulk request,
+on a temporary sqlite database.
+
+Run with: PYTHONPATH=. python benchmarks/bench_entries.py [entries]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+import yaml
+from fastapi.testclient import TestClient
+
+from screfinery import schema
+from screfinery.stores import user_store
+
+
+def entry(ids, quantity):
+    return {
+        "user": {"id": ids["user"]},
+        "station": {"id": ids["station"]},
+        "ore": {"id": ids["ore"]},
+        "method": {"id": ids["method"]},
+        "quantity": quantity,
+        "duration": 60,
+    }
+
+
+def setup(client):
+    ore_id = client.post("/ore/", json={"name": "Quantanium", "sell_price": 88}).json()["id"]
+    ids = {
+        "user": 1,
+        "ore": ore_id,
+        "station": client.post("/station/", json={
+            "name": "ARC-L1",
+            "efficiencies": [{"ore_id": ore_id, "efficiency_bonus": 0.1}],
+        }).json()["id"],
+        "method": client.post("/method/", json={
+            "name": "Dinyx Solventation",
+            "efficiencies": [{"ore_id": ore_id, "efficiency": 0.5, "duration": 1, "cost": 2}],
+        }).json()["id"],
+    }
+    return ids
+
+
+def create_session(client, name):
+    return client.post("/mining_session/", json={
+        "creator_id": 1, "name": name, "users_invited": [{"id": 1}],
+    }).json()["id"]
+
+
+def main(count):
+    tmp_dir = tempfile.mkdtemp()
+    config_path = os.path.join(tmp_dir, "config.yml")
+    with open(config_path, "w") as fp:
+        yaml.safe_dump({
+            "env": "dev",
+            "app": {
+                "password_salt": "salt",
+                "db": {
+                    "url": f"sqlite:///{tmp_dir}/app.db",
+                    "connect_args": {"check_same_thread": False},
+                    "sqlite": {},
+                },
+            },
+        }, fp)
+    os.environ["CONFIG_PATH"] = config_path
+    from screfinery.main import app
+
+    with TestClient(app, base_url="https://testserver") as client:
+        with app.state.db_session() as db:
+            user_store.create_one(db, schema.UserCreate(
+                name="admin", mail="admin@localhost", password="admin",
+                password_confirm="admin", is_google=False, is_active=True,
+                is_admin=True), "salt")
+        client.post("/login", json={"username": "admin@localhost", "password": "admin"})
+        ids = setup(client)
+
+        session_id = create_session(client, "single")
+        start = perf_counter()
+        for i in range(count):
+            client.post(f"/mining_session/{session_id}/entry", json=entry(ids, i + 1))
+        single = perf_counter() - start
+
+        session_id = create_session(client, "bulk")
+        start = perf_counter()
+        client.post(f"/mining_session/{session_id}/entries", json={
+            "entries": [entry(ids, i + 1) for i in range(count)]
+        })
+        bulk = perf_counter() - start
+
+    print(f"{count} entries")
+    print(f"  single requests {single * 1000:10.1f} ms")
+    print(f"  bulk request    {bulk * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
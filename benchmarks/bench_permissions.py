@@ -0,0 +1,48 @@
+"""
+Compare authorization checks through compiled permission sets against
+matching every scope with ``fnmatch``.
+
+Run with: python benchmarks/bench_permissions.py
+"""
+from fnmatch import fnmatch
+from timeit import repeat
+
+from screfinery.schema import USER_SCOPES
+from screfinery.stores.model import User, UserScope
+from screfinery.util import is_user_authorized
+
+REQUIRED_SCOPES = [
+    "mining_session.read",
+    "mining_session.update",
+    "station.list",
+    "user.update",
+]
+
+
+def fnmatch_is_user_authorized(user, required_scope):
+    user_scopes = [it.scope for it in user.scopes]
+    return any(fnmatch(required_scope, scope) for scope in user_scopes)
+
+
+def bench(label, func, user, number=20000):
+    def run():
+        for required_scope in REQUIRED_SCOPES:
+            func(user, required_scope)
+    best = min(repeat(run, number=number, repeat=5))
+    per_check = best / (number * len(REQUIRED_SCOPES)) * 1e6
+    print(f"{label:<28} {per_check:8.3f} µs/check")
+
+
+def main():
+    users = {
+        "user scopes": User(id=1, scopes=[UserScope(scope=it) for it in sorted(USER_SCOPES)]),
+        "admin scopes": User(id=2, scopes=[UserScope(scope="*")]),
+    }
+    for name, user in users.items():
+        print(name)
+        bench("  fnmatch", fnmatch_is_user_authorized, user)
+        bench("  compiled permissions", is_user_authorized, user)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Bounded in-process caches with LRU eviction and optional TTL.
+
+Every cache registers itself by name in ``caches`` so its counters can be
+reported by the ``/stats`` endpoint.
+"""
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Optional
+
+caches: Dict[str, "LRUCache"] = dict()
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread safe LRU cache, entries older than ``ttl`` seconds are treated as
+    missing. ``maxsize`` of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        caches[name] = self
+
+    def configure(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key: Hashable, default=None) -> Any:
+        with self._lock:
+            item = self._items.get(key, _MISSING)
+            if item is not _MISSING:
+                expires, value = item
+                if expires is None or expires > monotonic():
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._items[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            self._items[key] = (expires, value)
+            self._items.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove all entries whose key matches ``predicate``
+        """
+        with self._lock:
+            keys = [key for key in self._items if predicate(key)]
+            for key in keys:
+                del self._items[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self) -> None:
+        while len(self._items) > max(self.maxsize, 0):
+            self._items.popitem(last=False)
+            self.evictions += 1
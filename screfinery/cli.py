@@ -31,6 +31,19 @@ def create_schema(ctx):
     db.create_schema(config.app.db)
 
 
+@main.command()
+@click.option("--dry-run", is_flag=True, help="only list missing indexes")
+@click.pass_context
+def sync_indexes(ctx, dry_run):
+    """
+    Create indexes missing from existing tables
+    """
+    config = ctx.obj["config"]
+    missing = db.create_missing_indexes(config.app.db, dry_run)
+    for name in missing:
+        click.echo(f"{'missing' if dry_run else 'created'}: {name}")
+    if not missing:
+        click.echo("all indexes present")
 
 @main.group()
 def user():
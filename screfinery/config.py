@@ -3,7 +3,7 @@ from logging.config import dictConfig
 from typing import Optional
 
 import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 
 
 class GoogleConfig(BaseModel):
@@ -12,10 +12,49 @@ class GoogleConfig(BaseModel):
     certs: Optional[dict] = None
 
 
+SESSION_MODE_COOKIE = "cookie"
+SESSION_MODE_TOKEN = "token"
+
+
+class SessionConfig(BaseModel):
+    ### "cookie": sessions are stored in table user_session
+    ### "token": sessions are signed tokens, verified without database access
+    mode: str = SESSION_MODE_COOKIE
+    ### verified user sessions kept in memory, 0 disables the cache
+    cache_size: int = 1024
+    ### seconds until a cached session is verified against the database again
+    cache_ttl: float = 60
+    ### secret used to sign session tokens, required for mode "token"
+    token_secret: Optional[str] = None
+    ### seconds until a session token expires
+    token_ttl: int = 60 * 60 * 24
+    ### seconds between reloading token revocations from the database
+    revocation_refresh: float = 10
+
+    @validator("mode")
+    def mode_valid(cls, value):
+        if value not in (SESSION_MODE_COOKIE, SESSION_MODE_TOKEN):
+            raise ValueError(f"mode must be `{SESSION_MODE_COOKIE}` or `{SESSION_MODE_TOKEN}`")
+        return value
+
+    @validator("token_secret", always=True)
+    def token_secret_required(cls, value, values, **kwargs):
+        if values.get("mode") == SESSION_MODE_TOKEN and not value:
+            raise ValueError("token_secret is required for mode `token`")
+        return value
+
+
+class InstrumentationConfig(BaseModel):
+    ### log a warning for requests issuing more SQL statements, None disables
+    query_warning: Optional[int] = None
+
+
 class AppConfig(BaseModel):
     password_salt: str
     db: dict
     google: Optional[GoogleConfig] = None
+    session: SessionConfig = SessionConfig()
+    instrumentation: InstrumentationConfig = InstrumentationConfig()
 
 
 class Config(BaseModel):
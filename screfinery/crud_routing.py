@@ -2,10 +2,12 @@ from dataclasses import dataclass
 from typing import Optional, Callable, Type
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy.orm import Session
 
-from screfinery.dependency import use_db, verify_user_session
+from screfinery.dependency import use_store_db, verify_user_session
 from screfinery.errors import NotFoundError
+from screfinery.instrumentation import TimedRoute
+from screfinery.schema import CountMode
+from screfinery.stores.async_store import AsyncStoreAdapter, run_in_session
 from screfinery.types import Store
 from screfinery.util import parse_dict_str
 
@@ -40,6 +42,9 @@ def crud_router_factory(store: Store, endpoints: EndpointsDef,
     Creates basic list, read, create, update, delete HTTP endpoints and routes for
     a resource store
 
+    Handlers are async, store calls run on the session from `use_store_db`:
+    through `AsyncSession.run_sync` in async mode, in the threadpool otherwise.
+
     Example:
         >>> from screfinery.crud_routing import crud_router_factory
         >>> router = crud_router_factory(
@@ -58,7 +63,8 @@ def crud_router_factory(store: Store, endpoints: EndpointsDef,
 
     """
     route_prefix = route_prefix if route_prefix is not None else f"/{store.resource_name}"
-    routes = APIRouter(prefix=route_prefix, dependencies=dependencies)
+    routes = APIRouter(prefix=route_prefix, dependencies=dependencies,
+                       route_class=TimedRoute)
     setup_route_list(routes, endpoints.list, store)
     setup_route_read(routes, endpoints.read, store)
     setup_route_create(routes, endpoints.create, store)
@@ -67,6 +73,16 @@ def crud_router_factory(store: Store, endpoints: EndpointsDef,
     return routes
 
 
+def _from_orm(_db, response_model, item):
+    """
+    Convert ``item`` while its session is usable, relationships might still
+    have to be loaded.
+    """
+    if response_model is None or item is None:
+        return item
+    return response_model.from_orm(item)
+
+
 def setup_route_list(routes: APIRouter, route_def: RouteDef, store: Store):
     if route_def is None:
         return
@@ -81,22 +97,30 @@ def setup_route_list(routes: APIRouter, route_def: RouteDef, store: Store):
         return
 
     response_model = route_def.response_model
+    async_store = AsyncStoreAdapter(store)
+
+    def _list_response(_db, page):
+        return response_model(total_count=page.total_count, items=page.items,
+                              next_cursor=page.next_cursor)
 
     @routes.get("/", response_model=response_model, tags=tags)
-    def list_resource(offset: int = 0, limit: int = 25,
-                      filter: Optional[str] = None,
-                      sort: Optional[str] = None,
-                      db: Session = Depends(use_db),
-                      user_session=Depends(verify_user_session)):
+    async def list_resource(offset: int = 0, limit: int = 25,
+                            filter: Optional[str] = None,
+                            sort: Optional[str] = None,
+                            count: CountMode = CountMode.exact,
+                            cursor: Optional[str] = None,
+                            db=Depends(use_store_db),
+                            user_session=Depends(verify_user_session)):
         if route_def.authorize is not None:
             route_def.authorize(user_session.user,
                                 f"{store.resource_name}.{CRUD_SCOPE_LIST}")
         filter = parse_dict_str(filter)
         sort = parse_dict_str(sort)
         limit = limit if limit >= 0 else None
-        total_count, items = store.list_all(
-            db, offset=offset, limit=limit, filter_=filter, sort=sort)
-        return response_model(total_count=total_count, items=items)
+        page = await async_store.list_all(
+            db, offset=offset, limit=limit, filter_=filter, sort=sort,
+            count=count, cursor=cursor)
+        return await run_in_session(db, _list_response, page)
 
 
 def setup_route_read(routes: APIRouter, route_def: RouteDef, store: Store):
@@ -111,17 +135,19 @@ def setup_route_read(routes: APIRouter, route_def: RouteDef, store: Store):
             response_model=route_def.response_model, tags=tags)
         return
 
+    async_store = AsyncStoreAdapter(store)
+
     @routes.get("/{resource_id}",
                 response_model=route_def.response_model, tags=tags)
-    def read_resource(resource_id: int, db: Session = Depends(use_db),
-                      user_session=Depends(verify_user_session)):
-        item = store.get_by_id(db, resource_id)
+    async def read_resource(resource_id: int, db=Depends(use_store_db),
+                            user_session=Depends(verify_user_session)):
+        item = await async_store.get_by_id(db, resource_id)
         if route_def.authorize is not None:
             route_def.authorize(user_session.user,
                                 f"{store.resource_name}.{CRUD_SCOPE_READ}", item)
         if item is None:
             raise NotFoundError(store.resource_name, resource_id)
-        return item
+        return await run_in_session(db, _from_orm, route_def.response_model, item)
 
 
 def setup_route_create(routes: APIRouter, route_def: RouteDef, store: Store):
@@ -136,14 +162,17 @@ def setup_route_create(routes: APIRouter, route_def: RouteDef, store: Store):
             response_model=route_def.response_model, tags=tags)
         return
 
+    async_store = AsyncStoreAdapter(store)
+
     @routes.post("/", response_model=route_def.response_model, tags=tags)
-    def create_resource(item: route_def.request_model,
-                        db: Session = Depends(use_db),
-                        user_session=Depends(verify_user_session)):
+    async def create_resource(item: route_def.request_model,
+                              db=Depends(use_store_db),
+                              user_session=Depends(verify_user_session)):
         if route_def.authorize is not None:
             route_def.authorize(user_session.user,
                                 f"{store.resource_name}.{CRUD_SCOPE_CREATE}")
-        return store.create_one(db, item)
+        db_item = await async_store.create_one(db, item)
+        return await run_in_session(db, _from_orm, route_def.response_model, db_item)
 
 
 def setup_route_update(routes: APIRouter, route_def: RouteDef, store: Store):
@@ -158,20 +187,22 @@ def setup_route_update(routes: APIRouter, route_def: RouteDef, store: Store):
             response_model=route_def.response_model, tags=tags)
         return
 
+    async_store = AsyncStoreAdapter(store)
+
     @routes.put("/{resource_id}",
                 response_model=route_def.response_model, tags=tags)
-    def update_resource(resource_id: int,
-                        item: route_def.request_model,
-                        db: Session = Depends(use_db),
-                        user_session=Depends(verify_user_session)):
-        db_item = store.get_by_id(db, resource_id)
+    async def update_resource(resource_id: int,
+                              item: route_def.request_model,
+                              db=Depends(use_store_db),
+                              user_session=Depends(verify_user_session)):
+        db_item = await async_store.get_by_id(db, resource_id)
         if db_item is None:
             raise NotFoundError(store.resource_name, resource_id)
         if route_def.authorize is not None:
             route_def.authorize(user_session.user,
                                 f"{store.resource_name}.{CRUD_SCOPE_UPDATE}", db_item)
-        item = store.update_by_id(db, resource_id, item)
-        return item
+        db_item = await async_store.update_by_id(db, resource_id, item)
+        return await run_in_session(db, _from_orm, route_def.response_model, db_item)
 
 
 def setup_route_delete(routes: APIRouter, route_def: RouteDef, store: Store):
@@ -186,15 +217,17 @@ def setup_route_delete(routes: APIRouter, route_def: RouteDef, store: Store):
             response_model=route_def.response_model, tags=tags)
         return
 
+    async_store = AsyncStoreAdapter(store)
+
     @routes.delete("/{resource_id}",
                    response_model=route_def.response_model, tags=tags)
-    def delete_resource(resource_id: int, db: Session = Depends(use_db),
-                        user_session=Depends(verify_user_session)):
-        db_item = store.get_by_id(db, resource_id)
+    async def delete_resource(resource_id: int, db=Depends(use_store_db),
+                              user_session=Depends(verify_user_session)):
+        db_item = await async_store.get_by_id(db, resource_id)
         if db_item is None:
             raise NotFoundError(store.resource_name, resource_id)
         if route_def.authorize is not None:
             route_def.authorize(user_session.user,
                                 f"{store.resource_name}.{CRUD_SCOPE_DELETE}", db_item)
-        store.delete_by_id(db, resource_id)
+        await async_store.delete_by_id(db, resource_id)
         return Response(status_code=204)
@@ -1,17 +1,172 @@
-from sqlalchemy import engine_from_config, create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import logging
+from time import monotonic
+from typing import List
+
+from sqlalchemy import engine_from_config, create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_engine_from_config
+from sqlalchemy.orm import sessionmaker, Session
 
 from screfinery.stores.model import Base
 
+log = logging.getLogger(__name__)
+
+### keys of the db configuration handled here, not passed on to the engine
+APP_CONFIG_KEYS = ("async_url", "sqlite", "replicas", "replica_retry_after",
+                   "read_your_writes")
+
+### defaults for the ``sqlite`` section of the db configuration
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    ### bytes
+    "mmap_size": 256 * 1024 * 1024,
+    ### negative values are KiB
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+    ### milliseconds
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+}
+
+
+def _engine_config(config: dict) -> dict:
+    return {
+        key: value
+        for key, value in config.items()
+        if key not in APP_CONFIG_KEYS
+    }
+
+
+def _sqlite_pragmas(config: dict) -> dict:
+    if "sqlite" not in config:
+        return dict()
+    return {**SQLITE_PRAGMAS, **(config["sqlite"] or {})}
+
+
+def _pragma_value(value) -> str:
+    if value is True:
+        return "ON"
+    if value is False:
+        return "OFF"
+    return str(value)
+
+
+def _setup_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    """
+    Apply ``pragmas`` to every new connection of a sqlite ``engine``
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {_pragma_value(value)}")
+        cursor.close()
+
+
+def log_sqlite_pragmas(engine: Engine, config: dict) -> None:
+    """
+    Log the configured pragmas as reported by a new connection
+    """
+    pragmas = _sqlite_pragmas(config)
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    with engine.connect() as connection:
+        in_effect = {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in pragmas
+        }
+    log.info("sqlite pragmas in effect: " + ", ".join(
+        f"{name}={value}" for name, value in in_effect.items()))
+
 
 def init(config: dict, create_all=False) -> tuple:
-    engine = engine_from_config(config, prefix="")
+    engine = engine_from_config(_engine_config(config), prefix="")
+    _setup_sqlite_pragmas(engine, _sqlite_pragmas(config))
     session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     if create_all:
         Base.metadata.create_all(bind=engine)
     return engine, session_local
 
 
+class ReadRouter:
+    """
+    Creates sessions on replica engines in round robin order. A replica
+    failing to connect is skipped for ``retry_after`` seconds, without any
+    replica available sessions are created on the primary.
+    """
+
+    def __init__(self, primary: sessionmaker, replicas: List[sessionmaker],
+                 retry_after: float = 30, read_your_writes: int = 5):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_after = retry_after
+        ### seconds a client reads from primary after a write
+        self.read_your_writes = read_your_writes
+        self._down_until = [0.0] * len(replicas)
+        self._next = itertools.count()
+
+    def __call__(self) -> Session:
+        now = monotonic()
+        for _ in range(len(self.replicas)):
+            index = next(self._next) % len(self.replicas)
+            if self._down_until[index] > now:
+                continue
+            session = self.replicas[index]()
+            try:
+                session.connection()
+            except DBAPIError as exc:
+                session.close()
+                self._down_until[index] = now + self.retry_after
+                log.warning(f"replica {index} unavailable, retry after"
+                            f" {self.retry_after}s: {exc}")
+                continue
+            return session
+        return self.primary()
+
+
+def init_read(config: dict, session_local: sessionmaker):
+    """
+    Session factory for read only requests, a ``ReadRouter`` over the urls
+    listed in ``replicas``, otherwise ``session_local`` of the primary.
+    """
+    urls = config.get("replicas")
+    if not urls:
+        return session_local
+    replicas = []
+    for url in urls:
+        engine = engine_from_config({**_engine_config(config), "url": url},
+                                    prefix="")
+        _setup_sqlite_pragmas(engine, _sqlite_pragmas(config))
+        replicas.append(sessionmaker(autocommit=False, autoflush=False,
+                                     bind=engine))
+    return ReadRouter(session_local, replicas,
+                      retry_after=config.get("replica_retry_after", 30),
+                      read_your_writes=config.get("read_your_writes", 5))
+
+
+def init_async(config: dict) -> tuple:
+    """
+    Async mode is enabled by setting ``async_url`` to a database url with an
+    async driver, for example ``sqlite+aiosqlite:///app.db``. Returns
+    ``(None, None)`` when not enabled.
+    """
+    if not config.get("async_url"):
+        return None, None
+    engine_config = _engine_config(config)
+    engine_config["url"] = config["async_url"]
+    engine = async_engine_from_config(engine_config, prefix="")
+    _setup_sqlite_pragmas(engine.sync_engine, _sqlite_pragmas(config))
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine,
+                                 class_=AsyncSession)
+    return engine, session_local
+
+
 def dump_schema(config: dict) -> None:
     def _dump_executor(sql, *multiparams, **params):
         print(sql.compile(dialect=engine.dialect))
@@ -20,5 +175,29 @@ def dump_schema(config: dict) -> None:
 
 
 def create_schema(config: dict) -> None:
-    engine = engine_from_config(config, prefix="")
+    engine = engine_from_config(_engine_config(config), prefix="")
+    _setup_sqlite_pragmas(engine, _sqlite_pragmas(config))
     Base.metadata.create_all(bind=engine)
+
+
+def create_missing_indexes(config: dict, dry_run=False) -> List[str]:
+    """
+    Create indexes declared in the model but missing from existing tables of
+    the database, compared by index name. Returns names of missing indexes.
+    """
+    engine = engine_from_config(_engine_config(config), prefix="")
+    _setup_sqlite_pragmas(engine, _sqlite_pragmas(config))
+    inspector = inspect(engine)
+    table_names = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in table_names:
+            continue
+        existing = set(it["name"] for it in inspector.get_indexes(table.name))
+        for index in sorted(table.indexes, key=lambda it: it.name):
+            if index.name in existing:
+                continue
+            missing.append(index.name)
+            if not dry_run:
+                index.create(bind=engine)
+    return missing
@@ -1,24 +1,74 @@
 import logging
+from datetime import datetime, timedelta
+from time import time
 
-from fastapi import Request, Depends, HTTPException, status
+from fastapi import Request, Response, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from screfinery import session_token
+from screfinery.db import ReadRouter
+from screfinery.config import SESSION_MODE_TOKEN, SessionConfig
 from screfinery.stores import user_store
 from screfinery.util import parse_cookie_header
 
 log = logging.getLogger(__name__)
 
+READ_METHODS = ("GET", "HEAD")
+### cookie pinning reads of a client to primary after a write
+READ_PRIMARY_COOKIE = "p"
+### request header forcing reads from primary
+READ_PRIMARY_HEADER = "x-read-primary"
 
-def use_db(request: Request):
+
+def _is_read_primary(request: Request) -> bool:
+    if request.headers.get(READ_PRIMARY_HEADER):
+        return True
+    cookies = parse_cookie_header(request.headers.get("cookie"))
+    try:
+        return float(cookies.get(READ_PRIMARY_COOKIE, 0)) > time()
+    except ValueError:
+        return False
+
+
+def use_db(request: Request, response: Response):
+    """
+    Session on a read replica for GET and HEAD requests when replicas are
+    configured, on the primary for everything else. Writes pin the client's
+    reads to primary for ``read_your_writes`` seconds.
+    """
     app = request.app
-    db_session_maker = app.state.db_session
-    db_session = db_session_maker()
+    read_session_maker = app.state.db_read_session
+    if request.method in READ_METHODS and not _is_read_primary(request):
+        db_session = read_session_maker()
+    else:
+        db_session = app.state.db_session()
+        if (request.method not in READ_METHODS
+                and isinstance(read_session_maker, ReadRouter)
+                and read_session_maker.read_your_writes > 0):
+            window = read_session_maker.read_your_writes
+            response.set_cookie(READ_PRIMARY_COOKIE, str(int(time() + window)),
+                                path="/", max_age=window,
+                                samesite="none", secure=True, httponly=True)
     try:
         yield db_session
     finally:
         db_session.close()
 
 
+async def use_store_db(request: Request, db: Session = Depends(use_db)):
+    """
+    Session for store calls of routes created by `crud_router_factory`, an
+    `AsyncSession` when async mode is configured, otherwise the `Session`
+    from `use_db`.
+    """
+    async_session_maker = request.app.state.db_async_session
+    if async_session_maker is None:
+        yield db
+        return
+    async with async_session_maker() as async_db:
+        yield async_db
+
+
 def use_config(request: Request):
     app = request.app
     config = app.state.config
@@ -47,6 +97,10 @@ def _cookie_session_vars(request: Request):
 
 
 def _request_verify_user_session(request: Request, db: Session):
+    session_config = request.app.state.config.app.session
+    if session_config.mode == SESSION_MODE_TOKEN:
+        return _request_verify_token_session(request, db, session_config)
+
     user_ip = request.client.host
     user_id, cookie_session_hash = _cookie_session_vars(request)
     if cookie_session_hash is None or user_id is None:
@@ -55,6 +109,11 @@ def _request_verify_user_session(request: Request, db: Session):
                     f", user_session_hash:{cookie_session_hash}")
         raise HTTPException(status.HTTP_401_UNAUTHORIZED)
 
+    cache_key = (user_id, cookie_session_hash, user_ip)
+    cached_session = user_store.find_cached_session(db, cache_key)
+    if cached_session is not None:
+        return cached_session
+
     db_session, db_session_hash = user_store.find_session(db, user_id)
     if db_session is None:
         log.warning(f"session not found for user_id: {user_id}")
@@ -67,4 +126,34 @@ def _request_verify_user_session(request: Request, db: Session):
     if not is_valid_session:
         log.warning(f"session hash invalid for user_id: {user_id}")
         raise HTTPException(status.HTTP_403_FORBIDDEN)
-    return db_session
+    return user_store.cache_session(db, cache_key, db_session)
+
+
+def _request_verify_token_session(request: Request, db: Session,
+                                  session_config: SessionConfig):
+    user_ip = request.client.host
+    cookies = parse_cookie_header(request.headers.get("cookie"))
+    token = cookies.get("t")
+    if token is None:
+        log.warning(f"missing session token, user_ip:{user_ip}")
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
+
+    token_session = session_token.decode(session_config.token_secret, token)
+    if token_session is None:
+        log.warning(f"session token invalid, user_ip:{user_ip}")
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
+    if token_session.user_ip != user_ip:
+        log.warning(f"session token ip invalid for user_id: {token_session.user_id}")
+        raise HTTPException(status.HTTP_403_FORBIDDEN)
+    if token_session.expires <= time():
+        log.warning(f"session token expired for user_id: {token_session.user_id}")
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
+
+    revocations = session_token.revocations
+    if revocations.is_stale(session_config.revocation_refresh):
+        since = datetime.utcnow() - timedelta(seconds=session_config.token_ttl)
+        revocations.load(user_store.find_revocations(db, since))
+    if revocations.is_revoked(token_session):
+        log.warning(f"session token revoked for user_id: {token_session.user_id}")
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
+    return token_session
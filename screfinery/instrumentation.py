@@ -0,0 +1,111 @@
+"""
+Per request counters of SQL statements and time spent in the database,
+endpoint and response serialization.
+
+Counters live in ``request_stats`` for the duration of a request, set by
+``middleware.ServerTimingMiddleware``. Statements of all engines are counted
+once ``instrument_engines`` was called.
+"""
+import asyncio
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestStats:
+    __slots__ = ("start", "query_count", "db_time", "endpoint_end",
+                 "endpoint_db_time")
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.endpoint_end = None
+        self.endpoint_db_time = 0.0
+
+    def record_query(self, duration: float) -> None:
+        self.query_count += 1
+        self.db_time += duration
+
+    def endpoint_done(self) -> None:
+        self.endpoint_end = perf_counter()
+        self.endpoint_db_time = self.db_time
+
+    def segments(self) -> dict:
+        """
+        Seconds spent in segments db, app and serialize, and their total.
+        Queries issued while serializing, like lazy loads, count as db.
+        """
+        now = perf_counter()
+        total = now - self.start
+        serialize = 0.0
+        if self.endpoint_end is not None:
+            serialize = max(now - self.endpoint_end
+                            - (self.db_time - self.endpoint_db_time), 0.0)
+        return {
+            "db": self.db_time,
+            "app": max(total - self.db_time - serialize, 0.0),
+            "serialize": serialize,
+            "total": total,
+        }
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    context._query_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.record_query(perf_counter() - context._query_start)
+
+
+def instrument_engines() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _endpoint_done() -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats.endpoint_done()
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _endpoint_done()
+    else:
+        @wraps(endpoint)
+        def timed_endpoint(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _endpoint_done()
+    return timed_endpoint
+
+
+class TimedRoute(APIRoute):
+    """
+    Records when the endpoint returns, time from then until the response
+    starts is reported as serialization.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
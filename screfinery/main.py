@@ -27,15 +27,18 @@ from starlette.middleware.cors import ALL_METHODS, SAFELISTED_HEADERS
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError as SAIntegrityError
 
-from screfinery import db, version
+from screfinery import db, instrumentation, version
 from screfinery.config import load_config
 from screfinery.errors import IntegrityError
+from screfinery.middleware import ServerTimingMiddleware
 from screfinery.routes.auth import auth_routes
 from screfinery.routes.method import method_routes
 from screfinery.routes.mining_session import mining_session_routes
 from screfinery.routes.ore import ore_routes
 from screfinery.routes.station import station_routes
+from screfinery.routes.stats import stats_routes
 from screfinery.routes.user import user_routes
+from screfinery.stores import user_store
 from screfinery.util import format_validation_errors
 
 log = logging.getLogger("screfinery")
@@ -58,9 +61,17 @@ async def startup():
     is_env_dev = config.env == "dev"
     app.state.config = config
     app.debug = is_env_dev
+    instrumentation.instrument_engines()
     engine, session_maker = db.init(config.app.db, is_env_dev)
     app.state.db_engine = engine
+    db.log_sqlite_pragmas(engine, config.app.db)
     app.state.db_session = session_maker
+    app.state.db_read_session = db.init_read(config.app.db, session_maker)
+    async_engine, async_session_maker = db.init_async(config.app.db)
+    app.state.db_async_engine = async_engine
+    app.state.db_async_session = async_session_maker
+    user_store.session_cache.configure(config.app.session.cache_size,
+                                       config.app.session.cache_ttl)
 
     for route in app.routes:
         log.debug(f"{','.join(route.methods)} {route.path}")
@@ -138,9 +149,11 @@ async def add_CORS_header(request: Request, call_next):
     return response
 
 
+app.add_middleware(ServerTimingMiddleware)
 app.include_router(user_routes)
 app.include_router(station_routes)
 app.include_router(ore_routes)
 app.include_router(method_routes)
 app.include_router(mining_session_routes)
 app.include_router(auth_routes)
+app.include_router(stats_routes)
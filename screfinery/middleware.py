@@ -0,0 +1,73 @@
+"""
+ASGI middlewares
+"""
+import logging
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+from screfinery.instrumentation import RequestStats, request_stats
+
+log = logging.getLogger(__name__)
+
+
+def _query_warning(app) -> Optional[int]:
+    try:
+        return app.state.config.app.instrumentation.query_warning
+    except AttributeError:
+        return None
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a ``Server-Timing`` header with segments db, app and serialize to
+    responses and logs one line per request. Requests issuing more than
+    ``instrumentation.query_warning`` statements are logged as warning.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        scope.setdefault("state", {})["timing"] = stats
+        token = request_stats.set(stats)
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                segments = stats.segments()
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", ", ".join([
+                    f'db;dur={segments["db"] * 1000:.2f}'
+                    f';desc="{stats.query_count} queries"',
+                    f'app;dur={segments["app"] * 1000:.2f}',
+                    f'serialize;dur={segments["serialize"] * 1000:.2f}',
+                ]))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            self._log(scope, status_code, stats)
+
+    def _log(self, scope, status_code, stats: RequestStats) -> None:
+        segments = stats.segments()
+        line = (f"method={scope['method']} path={scope['path']}"
+                f" status={status_code} queries={stats.query_count}"
+                f" db_ms={segments['db'] * 1000:.2f}"
+                f" app_ms={segments['app'] * 1000:.2f}"
+                f" serialize_ms={segments['serialize'] * 1000:.2f}"
+                f" total_ms={segments['total'] * 1000:.2f}")
+        query_warning = _query_warning(scope["app"])
+        if query_warning is not None and stats.query_count > query_warning:
+            log.warning(f"query count above {query_warning}: {line}")
+        else:
+            log.info(line)
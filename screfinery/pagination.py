@@ -0,0 +1,210 @@
+"""
+Paging of list queries, by offset or by an opaque cursor (keyset pagination).
+
+Pages are ordered by the ``sort`` spec, with the primary key ``id`` as tie
+breaker. By offset, the total count is computed in the same statement
+through ``count(*) OVER ()``, where the database supports window functions.
+By cursor, rows following the last row of the previous page are selected by
+their sort key, deep pages cost the same as the first.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Optional, List, NamedTuple, Tuple
+
+from sqlalchemy import DateTime, and_, func, inspect, or_
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Query
+
+from screfinery.errors import IntegrityError
+from screfinery.schema import CountMode
+
+### count=estimate counts at most this many pages past the requested page
+ESTIMATE_PAGES = 10
+### count=estimate without limit counts at most this many rows
+ESTIMATE_ROWS = 1000
+
+
+class Page(NamedTuple):
+    ### None when not counted
+    total_count: Optional[int]
+    items: List
+    ### cursor of the following page, None on the last page
+    next_cursor: Optional[str] = None
+
+
+def supports_window_count(dialect: Dialect) -> bool:
+    version = dialect.server_version_info or (0,)
+    if dialect.name == "sqlite":
+        return version >= (3, 25)
+    if dialect.name == "mysql":
+        return version >= ((10, 2) if dialect.is_mariadb else (8,))
+    return True
+
+
+def sort_keys(model, sort: dict) -> List[Tuple[str, bool]]:
+    """
+    ``(attribute name, descending)`` of mapped columns in ``sort``, ending
+    with ``id`` as tie breaker
+    """
+    column_attrs = inspect(model).column_attrs
+    keys = [
+        (key, dir == "desc")
+        for key, dir in (sort or {}).items()
+        if key in column_attrs
+    ]
+    if "id" not in (key for key, _ in keys):
+        keys.append(("id", False))
+    return keys
+
+
+def _is_nullable(model, key: str) -> bool:
+    return any(
+        getattr(column, "nullable", False)
+        for column in inspect(model).column_attrs[key].columns
+    )
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(model, key: str, value):
+    column = inspect(model).column_attrs[key].columns[0]
+    if value is not None and isinstance(getattr(column, "type", None), DateTime):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def encode_cursor(keys: List[Tuple[str, bool]], item) -> str:
+    cursor = [
+        [[key, int(desc)] for key, desc in keys],
+        [_encode_value(getattr(item, key)) for key, _ in keys],
+    ]
+    data = json.dumps(cursor, separators=(",", ":")).encode("utf-8")
+    return urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(model, keys: List[Tuple[str, bool]], cursor: str) -> list:
+    try:
+        data = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_keys, values = json.loads(data)
+        if [tuple(it) for it in cursor_keys] != [(key, int(desc)) for key, desc in keys]:
+            raise ValueError("sort mismatch")
+        return [
+            _decode_value(model, key, value)
+            for (key, _), value in zip(keys, values)
+        ]
+    except (ValueError, TypeError):
+        raise IntegrityError("cursor is invalid or does not match sort")
+
+
+def _after_cursor(model, keys: List[Tuple[str, bool]], values: list):
+    """
+    Rows following ``values`` in the order of ``keys``
+    """
+    clauses = []
+    for index, (key, desc) in enumerate(keys):
+        attr = getattr(model, key)
+        clauses.append(and_(
+            *(getattr(model, prev_key) == prev_value
+              for (prev_key, _), prev_value in zip(keys[:index], values[:index])),
+            attr < values[index] if desc else attr > values[index]
+        ))
+    return or_(*clauses)
+
+
+def _count(query: Query) -> int:
+    return query.order_by(None).count()
+
+
+def _count_estimate(query: Query, offset: int, limit: Optional[int]) -> int:
+    """
+    Count of rows up to a bound past the requested page. Exact when fewer
+    rows match, a lower bound otherwise.
+    """
+    bound = offset + limit * ESTIMATE_PAGES if limit else offset + ESTIMATE_ROWS
+    entity = query.column_descriptions[0]["entity"]
+    bounded = (
+        query.order_by(None)
+        .with_entities(*inspect(entity).primary_key)
+        .limit(bound)
+        .subquery()
+    )
+    return query.session.query(func.count()).select_from(bounded).scalar()
+
+
+def _total_count(query: Query, offset: int, limit: Optional[int],
+                 count: CountMode) -> Optional[int]:
+    if count == CountMode.none:
+        return None
+    if count == CountMode.estimate:
+        return _count_estimate(query, offset, limit)
+    return _count(query)
+
+
+def paginate(query: Query, model, sort: dict,
+             offset: int = 0, limit: Optional[int] = None,
+             count: CountMode = CountMode.exact,
+             cursor: Optional[str] = None) -> Page:
+    """
+    Page of filtered ``query`` for ``model`` ordered by ``sort``, starting
+    after ``cursor`` if given, otherwise at ``offset``. Total count of
+    matching rows, according to ``count``:
+
+    - ``exact``: by offset in the same statement, with a separate count query
+      only when window functions are not supported or the page is empty.
+      Paged queries eager loading collections are wrapped in a subquery by
+      the ORM, the window counts rows before the collections are joined.
+      By cursor with a separate count query.
+    - ``estimate``: counted with a bound, see `_count_estimate`
+    - ``none``: not counted, total count is None
+
+    Cursor pagination requires sort columns that are not nullable.
+    """
+    keys = sort_keys(model, sort)
+    has_nullable_key = any(_is_nullable(model, key) for key, _ in keys)
+    query = query.order_by(*(
+        getattr(model, key).desc() if desc else getattr(model, key).asc()
+        for key, desc in keys
+    ))
+    page_query = query
+    if cursor:
+        if has_nullable_key:
+            raise IntegrityError(
+                "cursor pagination can not sort by nullable columns")
+        page_query = query.filter(
+            _after_cursor(model, keys, decode_cursor(model, keys, cursor)))
+        offset = 0
+    page_query = page_query.offset(offset or None)
+    ### one more row than requested tells whether a following page exists
+    page_query = page_query.limit(limit + 1 if limit is not None else None)
+
+    total_count = None
+    dialect = query.session.get_bind().dialect
+    if (not cursor and count == CountMode.exact
+            and limit is not None and supports_window_count(dialect)):
+        rows = page_query.add_columns(
+            func.count().over().label("total_count")).all()
+        if rows:
+            total_count = rows[0][-1]
+        elif not offset:
+            total_count = 0
+        else:
+            total_count = _count(query)
+        items = [row[0] for row in rows]
+    else:
+        items = page_query.all()
+        if cursor or limit is not None or offset:
+            total_count = _total_count(query, offset, limit, count)
+        elif count != CountMode.none:
+            total_count = len(items)
+
+    next_cursor = None
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        if not has_nullable_key:
+            next_cursor = encode_cursor(keys, items[-1])
+    return Page(total_count, items, next_cursor)
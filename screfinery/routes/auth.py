@@ -7,13 +7,16 @@ from google.auth import jwt
 from sqlalchemy.orm import Session
 
 from screfinery import schema
+from screfinery.config import SESSION_MODE_TOKEN
 from screfinery.dependency import use_db, use_config, verify_user_session
+from screfinery.instrumentation import TimedRoute
+from screfinery.session_token import TokenSession
 from screfinery.stores import user_store
 from screfinery.util import hash_password, parse_cookie_header
 
 log = logging.getLogger(__name__)
 ONE_DAY = 60 * 60 * 24
-auth_routes = APIRouter()
+auth_routes = APIRouter(route_class=TimedRoute)
 
 
 @auth_routes.post("/login", response_model=schema.User, tags=["user"])
@@ -23,13 +26,27 @@ def login(request: Request,
           config=Depends(use_config)) -> JSONResponse:
     """
     Given a username and password, create a user session and respond with user
-    and cookies ``u`` (user's id) and ``s`` (session hash).
+    and cookies ``u`` (user's id) and ``s`` (session hash), or ``t`` (signed
+    session token) when sessions are configured to use tokens.
     """
     password_hash = hash_password(config.app.password_salt, login.password)
     user = user_store.find_by_credentials(db, login.username, password_hash)
     if user is None:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED)
 
+    session_config = config.app.session
+    if session_config.mode == SESSION_MODE_TOKEN:
+        user_content = jsonable_encoder(schema.User.from_orm(user))
+        token = user_store.create_token_session(
+            db, user, request.client.host,
+            session_config.token_secret, session_config.token_ttl)
+        response = JSONResponse(status_code=200, content=user_content)
+        response.set_cookie("u", user.id, path="/", max_age=session_config.token_ttl,
+                            samesite="none", secure=True, httponly=False)
+        response.set_cookie("t", token, path="/", max_age=session_config.token_ttl,
+                            samesite="none", secure=True, httponly=False)
+        return response
+
     user_session, session_hash = user_store.create_session(db, user, request.client.host)
     response = JSONResponse(
         status_code=200,
@@ -43,17 +60,24 @@ def login(request: Request,
 
 
 @auth_routes.post("/login_session", response_model=schema.User, tags=["user"])
-def login_session(user_session=Depends(verify_user_session)):
+def login_session(db: Session = Depends(use_db),
+                  user_session=Depends(verify_user_session)):
+    if isinstance(user_session, TokenSession):
+        return user_store.get_by_id(db, user_session.user_id)
     return user_session.user
 
 
 @auth_routes.post("/logout", tags=["user"])
 def logout(db: Session = Depends(use_db),
            user_session=Depends(verify_user_session)):
-    user_store.delete_session(db, user_session)
+    if isinstance(user_session, TokenSession):
+        user_store.logout_token_session(db, user_session.user_id)
+    else:
+        user_store.delete_session(db, user_session)
     response = JSONResponse("/")
     response.delete_cookie("u", path="/")
     response.delete_cookie("s", path="/")
+    response.delete_cookie("t", path="/")
     return response
 
 
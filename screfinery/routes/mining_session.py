@@ -1,7 +1,9 @@
 """
 HTTP endpoints for `mining_session_store`
 """
-from fastapi import HTTPException, status, Depends
+from typing import Union
+
+from fastapi import HTTPException, Response, status, Depends
 from sqlalchemy.orm import Session
 
 from screfinery import schema
@@ -11,7 +13,7 @@ from screfinery.crud_routing import crud_router_factory, \
 from screfinery.dependency import use_db, verify_user_session
 from screfinery.errors import IntegrityError, NotFoundError
 from screfinery.stores import mining_session_store
-from screfinery.util import is_user_authorized, first
+from screfinery.util import is_user_authorized
 
 
 def authorize(user, scope, item=None):
@@ -62,74 +64,121 @@ mining_session_routes = crud_router_factory(
 )
 
 
+ENTRY_WRITE_RESPONSES = {
+    200: {"model": Union[schema.MiningSessionWithUsersEntries, schema.MiningSessionEntry]},
+    204: {"description": "Response mode `none`"},
+}
+
+
+def _entry_write_response(db: Session, session_id: int, entry_id: int,
+                          response: schema.EntryResponseMode):
+    if response == schema.EntryResponseMode.none:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    if response == schema.EntryResponseMode.entry:
+        return schema.MiningSessionEntry.from_orm(
+            mining_session_store.get_entry_by_id(db, session_id, entry_id,
+                                                 load_related=True))
+    return schema.MiningSessionWithUsersEntries.from_orm(
+        mining_session_store.get_by_id(db, session_id))
+
+
 @mining_session_routes.post("/{resource_id}/entry",
                             tags=["mining_session"],
-                            response_model=schema.MiningSessionWithUsersEntries)
+                            responses=ENTRY_WRITE_RESPONSES)
 def mining_session_create_entry(
         resource_id: int,
         entry: schema.MiningSessionEntryCreate,
+        response: schema.EntryResponseMode = schema.EntryResponseMode.session,
         db: Session = Depends(use_db),
-        user_session=Depends(verify_user_session)) -> schema.MiningSessionWithUsersEntries:
-    db_mining_session = mining_session_store.get_by_id(db, resource_id)
+        user_session=Depends(verify_user_session)):
+    """
+    Responds with the whole mining session, with ``response=entry`` just the
+    created entry, with ``response=none`` no content.
+    """
+    db_mining_session = mining_session_store.get_header_by_id(db, resource_id)
     if db_mining_session is None:
         raise NotFoundError("mining_session", resource_id)
     authorize(user_session.user, f"mining_session.{CRUD_SCOPE_CREATE}", db_mining_session)
 
-    users_invited = set(it.user.id for it in db_mining_session.users_invited)
-    if entry.user.id not in users_invited:
+    if not mining_session_store.is_user_invited(db, resource_id, entry.user.id):
         raise IntegrityError(
             f"User `{entry.user.id}` is not invited to mining session `{resource_id}`")
 
-    db_mining_session = mining_session_store.add_entry(db, db_mining_session, entry)
-    return db_mining_session
+    db_entry = mining_session_store.add_entry(db, resource_id, entry)
+    return _entry_write_response(db, resource_id, db_entry.id, response)
+
+
+@mining_session_routes.post("/{resource_id}/entries",
+                            tags=["mining_session"],
+                            response_model=schema.MiningSessionEntryBulkResult)
+def mining_session_create_entries(
+        resource_id: int,
+        bulk: schema.MiningSessionEntryBulkCreate,
+        db: Session = Depends(use_db),
+        user_session=Depends(verify_user_session)) -> schema.MiningSessionEntryBulkResult:
+    """
+    Create up to 1000 entries at once. Valid entries are created, invalid
+    entries are reported with their index in ``items``.
+    """
+    db_mining_session = mining_session_store.get_header_by_id(db, resource_id)
+    if db_mining_session is None:
+        raise NotFoundError("mining_session", resource_id)
+    authorize(user_session.user, f"mining_session.{CRUD_SCOPE_CREATE}", db_mining_session)
+    return mining_session_store.add_entries(db, resource_id, bulk.entries)
 
 
 @mining_session_routes.put("/{resource_id}/entry/{entry_id}",
                            tags=["mining_session"],
-                           response_model=schema.MiningSessionWithUsersEntries)
+                           responses=ENTRY_WRITE_RESPONSES)
 def mining_session_update_entry(
         resource_id: int,
         entry_id: int,
         entry: schema.MiningSessionEntryUpdate,
+        response: schema.EntryResponseMode = schema.EntryResponseMode.session,
         db: Session = Depends(use_db),
-        user_session=Depends(verify_user_session)) -> schema.MiningSessionWithUsersEntries:
-    db_mining_session = mining_session_store.get_by_id(db, resource_id)
+        user_session=Depends(verify_user_session)):
+    """
+    Responds with the whole mining session, with ``response=entry`` just the
+    updated entry, with ``response=none`` no content.
+    """
+    db_mining_session = mining_session_store.get_header_by_id(db, resource_id)
     if db_mining_session is None:
         raise NotFoundError("mining_session", resource_id)
     authorize(user_session.user, f"mining_session.{CRUD_SCOPE_UPDATE}", db_mining_session)
-    db_entry = first(
-        entry for entry in db_mining_session.entries
-        if entry.id == entry_id
-    )
+    db_entry = mining_session_store.get_entry_by_id(db, resource_id, entry_id)
     if db_entry is None:
         raise NotFoundError("mining_session.entry", entry_id)
     authorize(user_session.user, f"mining_session.{CRUD_SCOPE_UPDATE}", db_entry)
-    db_mining_session = mining_session_store.update_entry(
-        db, db_mining_session, db_entry, entry)
-    return db_mining_session
-
+    mining_session_store.update_entry(db, db_entry, entry)
+    return _entry_write_response(db, resource_id, entry_id, response)
 
 
 @mining_session_routes.delete("/{resource_id}/entry/{entry_id}",
                               tags=["mining_session"],
-                              response_model=schema.MiningSessionWithUsersEntries)
+                              responses=ENTRY_WRITE_RESPONSES)
 def mining_session_delete_entry(
         resource_id: int, entry_id: int,
-        db: Session = Depends(use_db), user_session = Depends(verify_user_session)
-        ) -> schema.MiningSessionWithUsersEntries:
-    db_mining_session = mining_session_store.get_by_id(db, resource_id)
-    if db_mining_session is None:
+        response: schema.EntryResponseMode = schema.EntryResponseMode.session,
+        db: Session = Depends(use_db), user_session = Depends(verify_user_session)):
+    """
+    Responds with the whole mining session, with ``response=entry`` the
+    deleted entry, with ``response=none`` no content.
+    """
+    if mining_session_store.get_header_by_id(db, resource_id) is None:
         raise NotFoundError("mining_session", resource_id)
-    db_entry = first(
-        entry for entry in db_mining_session.entries
-        if entry.id == entry_id
-    )
+    db_entry = mining_session_store.get_entry_by_id(
+        db, resource_id, entry_id,
+        load_related=response == schema.EntryResponseMode.entry)
     if db_entry is None:
         raise NotFoundError("mining_session.entry", entry_id)
     authorize(user_session.user, f"mining_session.{CRUD_SCOPE_DELETE}", db_entry)
-    db_mining_session = mining_session_store.delete_entry(
-        db, db_mining_session, db_entry)
-    return db_mining_session
+    deleted_entry = None
+    if response == schema.EntryResponseMode.entry:
+        deleted_entry = schema.MiningSessionEntry.from_orm(db_entry)
+    mining_session_store.delete_entry(db, db_entry)
+    if deleted_entry is not None:
+        return deleted_entry
+    return _entry_write_response(db, resource_id, entry_id, response)
 
 
 @mining_session_routes.get("/{resource_id}/payout_summary",
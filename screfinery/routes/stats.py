@@ -0,0 +1,23 @@
+"""
+HTTP endpoints for runtime statistics of this process
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from screfinery.cache import caches
+from screfinery.dependency import verify_user_session
+from screfinery.instrumentation import TimedRoute
+from screfinery.util import is_user_authorized
+
+stats_routes = APIRouter(route_class=TimedRoute)
+
+
+@stats_routes.get("/stats", tags=["stats"])
+def get_stats(user_session=Depends(verify_user_session)) -> dict:
+    """
+    Requires permission ``stats.read``. Counters are kept per process.
+    """
+    if not is_user_authorized(user_session.user, "stats.read"):
+        raise HTTPException(status.HTTP_403_FORBIDDEN)
+    return {
+        "caches": {name: cache.stats() for name, cache in caches.items()}
+    }
@@ -8,9 +8,10 @@ Request and response object schemas with validation
 """
 
 from datetime import datetime
+from enum import Enum
 from typing import Optional, Generic, TypeVar, Any, List
 
-from pydantic import BaseModel, validator, confloat, constr, conint
+from pydantic import BaseModel, validator, confloat, constr, conint, conlist
 from pydantic.generics import GenericModel
 
 
@@ -40,9 +41,21 @@ class Related(BaseModel):
         orm_mode = True
 
 
+class CountMode(str, Enum):
+    """
+    Total count of list responses: exact, estimated or not counted
+    """
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
 class ListResponse(GenericModel, Generic[ItemT]):
-    total_count: int
+    ### None when not counted
+    total_count: Optional[int]
     items: List[ItemT]
+    ### pass as ``cursor`` to fetch the following page, None on the last page
+    next_cursor: Optional[str]
 
 
 class Login(BaseModel):
@@ -307,6 +320,36 @@ class MiningSessionEntryCreate(BaseModel):
     duration: conint(ge=0)
 
 
+class EntryResponseMode(str, Enum):
+    """
+    Response of entry writes: the changed entry, the whole mining session,
+    or no content
+    """
+    entry = "entry"
+    session = "session"
+    none = "none"
+
+
+class MiningSessionEntryBulkCreate(BaseModel):
+    entries: conlist(MiningSessionEntryCreate, min_items=1, max_items=1000)
+
+
+class MiningSessionEntryBulkItem(BaseModel):
+    """
+    Status of one entry of a bulk create, ``index`` refers to its position in
+    the request. ``error`` is set for status "invalid".
+    """
+    index: int
+    status: str
+    error: Optional[str]
+
+
+class MiningSessionEntryBulkResult(BaseModel):
+    created: int
+    invalid: int
+    items: List[MiningSessionEntryBulkItem]
+
+
 class MiningSessionEntryUpdate(BaseModel):
     user: Optional[Related]
     station: Optional[Related]
@@ -0,0 +1,121 @@
+"""
+Stateless session tokens signed with HMAC-SHA256.
+
+A token is ``<payload>.<signature>``, both urlsafe base64 without padding.
+The payload is a compact JSON array of version, user id, bound ip, issue and
+expiry timestamps and the user's scopes, so verifying a token and
+authorizing requests need no database access.
+
+Logout and scope changes revoke all tokens of a user issued before a point
+in time. Revocations are stored in table ``user_session_revocation`` and
+mirrored by `revocations`, which is reloaded periodically so revocations
+made by other processes apply as well.
+"""
+import hmac
+import json
+import threading
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timezone
+from hashlib import sha256
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from screfinery.util import obj
+
+TOKEN_VERSION = 1
+
+
+class TokenSession:
+    """
+    Session verified from a token, with the same ``user_id``, ``user_ip`` and
+    ``user`` attributes used from `screfinery.stores.model.UserSession`.
+    ``user`` only carries ``id`` and ``scopes``.
+    """
+
+    def __init__(self, user_id: int, user_ip: str, issued: float,
+                 expires: float, scopes: List[str]):
+        self.user_id = user_id
+        self.user_ip = user_ip
+        self.issued = issued
+        self.expires = expires
+        self.user = obj(id=user_id, scopes=[obj(scope=it) for it in scopes])
+
+
+def _b64encode(value: bytes) -> str:
+    return urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(value: str) -> bytes:
+    return urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _signature(secret: str, payload: str) -> str:
+    digest = hmac.new(secret.encode("utf-8"), payload.encode("ascii"), sha256)
+    return _b64encode(digest.digest())
+
+
+def encode(secret: str, user_id: int, user_ip: str, scopes: Iterable[str],
+           issued: float, expires: float) -> str:
+    payload = _b64encode(json.dumps(
+        [TOKEN_VERSION, user_id, user_ip, issued, expires, ",".join(scopes)],
+        separators=(",", ":")
+    ).encode("utf-8"))
+    return f"{payload}.{_signature(secret, payload)}"
+
+
+def decode(secret: str, token: str) -> Optional[TokenSession]:
+    """
+    Returns `TokenSession` if the signature of ``token`` is valid, expiry and
+    ip binding are left to the caller.
+    """
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature, _signature(secret, payload)):
+        return None
+    try:
+        version, user_id, user_ip, issued, expires, scopes = json.loads(
+            _b64decode(payload))
+    except ValueError:
+        return None
+    if version != TOKEN_VERSION:
+        return None
+    return TokenSession(user_id, user_ip, issued, expires,
+                        scopes.split(",") if scopes else [])
+
+
+def timestamp(value: datetime) -> float:
+    """
+    Timestamp of a naive UTC datetime, as stored in the database
+    """
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    """
+    In-memory copy of table ``user_session_revocation``, limited to
+    revocations younger than the token lifetime.
+    """
+
+    def __init__(self):
+        self._not_before: Dict[int, float] = dict()
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def is_stale(self, refresh_interval: float) -> bool:
+        return self._loaded is None or monotonic() - self._loaded > refresh_interval
+
+    def load(self, revocations: Iterable[Tuple[int, datetime]]) -> None:
+        not_before = {user_id: timestamp(value) for user_id, value in revocations}
+        with self._lock:
+            self._not_before = not_before
+            self._loaded = monotonic()
+
+    def revoke(self, user_id: int, not_before: datetime) -> None:
+        with self._lock:
+            self._not_before[user_id] = timestamp(not_before)
+
+    def is_revoked(self, token_session: TokenSession) -> bool:
+        not_before = self._not_before.get(token_session.user_id)
+        return not_before is not None and token_session.issued < not_before
+
+
+revocations = RevocationList()
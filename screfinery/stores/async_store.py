@@ -0,0 +1,59 @@
+"""
+Async access to store modules.
+
+Store modules are written against the sync `Session` API. `AsyncStoreAdapter`
+runs them through `AsyncSession.run_sync`, which drives the async database
+driver from a greenlet without blocking the event loop or a worker thread.
+Given a sync `Session`, the calls run in the threadpool instead, just as sync
+route handlers do.
+"""
+from typing import Callable, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from screfinery.schema import CountMode
+from screfinery.types import Store
+
+
+async def run_in_session(db: Union[Session, AsyncSession], func: Callable,
+                         *args, **kwargs):
+    """
+    Call ``func(session, *args, **kwargs)`` with the sync session of ``db``.
+    ORM objects of an `AsyncSession` must only be accessed this way when
+    their attributes might need to be loaded, for example while serializing.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return await run_in_threadpool(func, db, *args, **kwargs)
+
+
+class AsyncStoreAdapter:
+    """
+    Implements `screfinery.types.AsyncStore` for a store module
+    """
+
+    def __init__(self, store: Store):
+        self.store = store
+        self.resource_name = store.resource_name
+
+    async def get_by_id(self, db, id: int):
+        return await run_in_session(db, self.store.get_by_id, id)
+
+    async def list_all(self, db, offset: int = 0, limit: int = None,
+                       filter_: dict = None, sort: dict = None,
+                       count: CountMode = CountMode.exact,
+                       cursor: Optional[str] = None):
+        return await run_in_session(db, self.store.list_all, offset=offset,
+                                    limit=limit, filter_=filter_, sort=sort,
+                                    count=count, cursor=cursor)
+
+    async def create_one(self, db, data):
+        return await run_in_session(db, self.store.create_one, data)
+
+    async def update_by_id(self, db, id: int, data):
+        return await run_in_session(db, self.store.update_by_id, id, data)
+
+    async def delete_by_id(self, db, id: int):
+        return await run_in_session(db, self.store.delete_by_id, id)
@@ -2,14 +2,16 @@
 CRUD methods for `method` objects.
 """
 
-from typing import Optional, Tuple, List
+from typing import Optional, List
 
-from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.orm import Session, contains_eager, joinedload
 
 from screfinery import schema
-from screfinery.errors import IntegrityError
-from screfinery.stores.model import Method, MethodOre, Ore
-from screfinery.util import first, sa_filter_from_dict, sa_order_by_from_dict
+from screfinery.pagination import Page, paginate
+from screfinery.schema import CountMode
+from screfinery.stores import ore_store
+from screfinery.stores.model import Method, MethodOre
+from screfinery.util import first, sa_filter_from_dict
 
 resource_name = "method"
 
@@ -31,76 +33,64 @@ def get_by_id(db: Session, method_id: int) -> Method:
 
 def list_all(db: Session,
              offset: int = 0, limit: int = None,
-             filter_: dict = None, sort: dict = None
-             ) -> Tuple[int, List[Method]]:
+             filter_: dict = None, sort: dict = None,
+             count: CountMode = CountMode.exact,
+             cursor: Optional[str] = None
+             ) -> Page:
     filter_ = sa_filter_from_dict(Method, filter_)
-    order_by = sa_order_by_from_dict(Method, sort)
-    main_query = (
+    return paginate(
         db.query(Method)
         .filter(filter_)
-        .limit(limit)
-        .offset(offset)
-        .subquery()
-    )
-    return (
-        db.query(Method).filter(filter_).count(),
-        (
-            db.query(Method)
-            .join(main_query, main_query.c.id == Method.id)
-            .outerjoin(Method.efficiencies)
-            .outerjoin(MethodOre.ore)
-            .options(
-                contains_eager(Method.efficiencies)
-                .contains_eager(MethodOre.ore)
-            )
-            .order_by(*order_by)
-            .all()
-        )
+        .options(joinedload(Method.efficiencies).joinedload(MethodOre.ore)),
+        Method, sort, offset, limit, count, cursor
     )
 
 
-def _create_checked_method_ore_rel(db: Session, method: Method, efficiency: schema.MethodOreEfficiency):
-    ore = db.query(Ore).filter(Ore.id == efficiency.ore_id).first()
-    if ore is None:
-        raise IntegrityError(f"Ore with id `{efficiency.ore_id}` does not exist")
-    return MethodOre(
-        method=method,
-        ore=ore,
-        efficiency=efficiency.efficiency,
-        duration=efficiency.duration,
-        cost=efficiency.cost,
-    )
+def _insert_method_ores(db: Session, method_id: int,
+                         efficiencies: List[schema.MethodOreEfficiency]):
+    """
+    Insert `MethodOre` rows of ``method_id`` with one bulk insert
+    """
+    db.bulk_insert_mappings(MethodOre, [
+        dict(
+            method_id=method_id,
+            ore_id=eff.ore_id,
+            efficiency=eff.efficiency,
+            duration=eff.duration,
+            cost=eff.cost,
+        )
+        for eff in efficiencies
+    ])
 
 
 def create_one(db: Session, method: schema.MethodCreate) -> Method:
+    ore_store.check_ids_exist(db, (eff.ore_id for eff in method.efficiencies))
     db_method = Method(
         name=method.name,
     )
-    db_method.efficiencies = [
-        _create_checked_method_ore_rel(db, db_method, efficiency)
-        for efficiency in method.efficiencies
-    ]
     db.add(db_method)
+    db.flush()
+    method_id = db_method.id
+    _insert_method_ores(db, method_id, method.efficiencies)
     db.commit()
-    db.refresh(db_method)
-    return db_method
+    return get_by_id(db, method_id)
 
 
 def update_by_id(db: Session, method_id: int, method: schema.MethodUpdate) -> Optional[Method]:
-    db_method = get_by_id(db, method_id)
+    db_method = db.query(Method).filter(Method.id == method_id).first()
     if db_method is None:
         return None
+    if method.efficiencies is not None:
+        ore_store.check_ids_exist(db, (eff.ore_id for eff in method.efficiencies))
     if method.name is not None:
         db_method.name = method.name
-    if method.efficiencies is not None:
-        db_method.efficiencies = [
-            _create_checked_method_ore_rel(db, db_method, efficiency)
-            for efficiency in method.efficiencies
-        ]
     db.add(db_method)
+    db.flush()
+    if method.efficiencies is not None:
+        db.query(MethodOre).filter(MethodOre.method_id == method_id).delete()
+        _insert_method_ores(db, method_id, method.efficiencies)
     db.commit()
-    db.refresh(db_method)
-    return db_method
+    return get_by_id(db, method_id)
 
 
 def delete_by_id(db: Session, method_id: int):
@@ -3,16 +3,18 @@ CRUD methods for `mining_session` objects.
 """
 from collections import defaultdict
 from decimal import ROUND_HALF_UP, Decimal
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Type
 
+from sqlalchemy import select, literal, union_all, insert, exists, and_
 from sqlalchemy.orm import Session, contains_eager, joinedload
 
 from screfinery import schema
 from screfinery.errors import IntegrityError
-from screfinery.schema import Related
+from screfinery.pagination import Page, paginate
+from screfinery.schema import CountMode, Related
 from screfinery.stores.model import MiningSession, \
-    MiningSessionEntry, User, Station, Ore, Method
-from screfinery.util import sa_filter_from_dict, sa_order_by_from_dict
+    MiningSessionEntry, User, Station, Ore, Method, mining_session_user
+from screfinery.util import sa_filter_from_dict
 
 resource_name = "mining_session"
 
@@ -44,18 +46,15 @@ def get_by_id(db: Session, session_id: int) -> MiningSession:
 
 def list_all(db: Session, offset: int = 0, limit: int = None,
              filter_: dict = None, sort: dict = None,
-             ) -> Tuple[int, List[MiningSession]]:
+             count: CountMode = CountMode.exact,
+             cursor: Optional[str] = None
+             ) -> Page:
     filter_ = sa_filter_from_dict(MiningSession, filter_)
-    order_by = sa_order_by_from_dict(MiningSession, sort)
-    return (
-        db.query(MiningSession).filter(filter_).count(),
+    return paginate(
         db.query(MiningSession)
         .options(joinedload(MiningSession.creator))
-        .filter(filter_)
-        .order_by(*order_by)
-        .limit(limit)
-        .offset(offset)
-        .all()
+        .filter(filter_),
+        MiningSession, sort, offset, limit, count, cursor
     )
 
 
@@ -98,57 +97,194 @@ def delete_by_id(db: Session, mining_session_id: int):
     db.commit()
 
 
-def add_entry(db: Session, db_mining_session: MiningSession,
-              entry: schema.MiningSessionEntryCreate) -> MiningSession:
+ENTRY_CREATED = "created"
+ENTRY_INVALID = "invalid"
+
+
+def get_header_by_id(db: Session, session_id: int) -> Optional[MiningSession]:
+    """
+    Mining session without relationships loaded
+    """
+    return db.query(MiningSession).filter(MiningSession.id == session_id).first()
+
+
+def find_invited_user_ids(db: Session, session_id: int) -> set:
+    return set(
+        user_id for user_id, in
+        db.query(mining_session_user.c.user_id)
+        .filter(mining_session_user.c.session_id == session_id)
+    )
+
+
+def _existing_rels(db: Session, rel_ids: dict) -> set:
+    """
+    ``(model name, id)`` of all ``rel_ids`` ``{model: ids}`` that exist,
+    fetched with one UNION ALL statement.
+    """
+    probes = [
+        select([literal(model.__name__).label("model"), model.id])
+        .where(model.id.in_(ids))
+        for model, ids in rel_ids.items()
+        if ids
+    ]
+    if not probes:
+        return set()
+    return set(tuple(row) for row in db.execute(union_all(*probes)))
+
+
+def add_entries(db: Session, session_id: int,
+                entries: List[schema.MiningSessionEntryCreate]
+                ) -> schema.MiningSessionEntryBulkResult:
+    """
+    Validate all ``entries`` in one pass and insert the valid ones with one
+    executemany in a single transaction. Invalid entries are reported per
+    item with the messages of `add_entry`.
+    """
+    invited = find_invited_user_ids(db, session_id)
+    models = (User, Station, Ore, Method)
+    existing = _existing_rels(db, {
+        model: set(getattr(entry, model.__name__.lower()).id for entry in entries)
+        for model in models
+    })
+    rows = []
+    items = []
+    for index, entry in enumerate(entries):
+        error = None
+        if entry.user.id not in invited:
+            error = (f"User `{entry.user.id}` is not invited to mining"
+                     f" session `{session_id}`")
+        for model in models:
+            rel_id = getattr(entry, model.__name__.lower()).id
+            if error is None and (model.__name__, rel_id) not in existing:
+                error = f"{model.__name__} for id `{rel_id}` not found"
+        if error is not None:
+            items.append(schema.MiningSessionEntryBulkItem(
+                index=index, status=ENTRY_INVALID, error=error))
+            continue
+        rows.append(dict(
+            session_id=session_id,
+            user_id=entry.user.id,
+            station_id=entry.station.id,
+            ore_id=entry.ore.id,
+            method_id=entry.method.id,
+            quantity=entry.quantity,
+            duration=entry.duration,
+        ))
+        items.append(schema.MiningSessionEntryBulkItem(
+            index=index, status=ENTRY_CREATED))
+    if rows:
+        db.execute(insert(MiningSessionEntry), rows)
+        db.commit()
+    return schema.MiningSessionEntryBulkResult(
+        created=len(rows),
+        invalid=len(items) - len(rows),
+        items=items,
+    )
+
+
+def get_entry_by_id(db: Session, session_id: int, entry_id: int,
+                    load_related=False) -> Optional[MiningSessionEntry]:
+    """
+    Entry ``entry_id`` of mining session ``session_id``, with
+    ``load_related`` its relationships needed by `schema.MiningSessionEntry`
+    are loaded eagerly.
+    """
+    query = db.query(MiningSessionEntry).filter(
+        MiningSessionEntry.session_id == session_id,
+        MiningSessionEntry.id == entry_id,
+    )
+    if load_related:
+        query = query.options(
+            joinedload(MiningSessionEntry.user),
+            joinedload(MiningSessionEntry.ore),
+            joinedload(MiningSessionEntry.method),
+            joinedload(MiningSessionEntry.station),
+            joinedload(MiningSessionEntry.method_eff),
+            joinedload(MiningSessionEntry.station_eff),
+        )
+    return query.first()
+
+
+def is_user_invited(db: Session, session_id: int, user_id: int) -> bool:
+    return db.query(exists().where(and_(
+        mining_session_user.c.session_id == session_id,
+        mining_session_user.c.user_id == user_id,
+    ))).scalar()
+
+
+def add_entry(db: Session, session_id: int,
+              entry: schema.MiningSessionEntryCreate) -> MiningSessionEntry:
+    _check_rels(db, [
+        (User, entry.user.id),
+        (Station, entry.station.id),
+        (Ore, entry.ore.id),
+        (Method, entry.method.id),
+    ])
     db_entry = MiningSessionEntry(
-        session=db_mining_session,
-        user=_checked_rel(db, User, entry.user.id),
-        station=_checked_rel(db, Station, entry.station.id),
-        ore=_checked_rel(db, Ore, entry.ore.id),
-        method=_checked_rel(db, Method, entry.method.id),
+        session_id=session_id,
+        user_id=entry.user.id,
+        station_id=entry.station.id,
+        ore_id=entry.ore.id,
+        method_id=entry.method.id,
         quantity=entry.quantity,
         duration=entry.duration,
     )
-    db_mining_session.entries.append(db_entry)
-    db.add(db_mining_session)
+    db.add(db_entry)
     db.commit()
-    db.refresh(db_mining_session)
-    return db_mining_session
+    return db_entry
 
 
-def update_entry(db: Session, db_mining_session: MiningSession,
-                 db_entry: MiningSessionEntry,
-                 entry_update: schema.MiningSessionEntryUpdate) -> MiningSession:
+def update_entry(db: Session, db_entry: MiningSessionEntry,
+                 entry_update: schema.MiningSessionEntryUpdate) -> MiningSessionEntry:
+    rels = [
+        (model, rel.id)
+        for model, rel in (
+            (User, entry_update.user),
+            (Station, entry_update.station),
+            (Ore, entry_update.ore),
+            (Method, entry_update.method),
+        )
+        if rel is not None
+    ]
+    _check_rels(db, rels)
     if entry_update.user is not None:
-        db_entry.user = _checked_rel(db, User, entry_update.user.id)
+        db_entry.user_id = entry_update.user.id
     if entry_update.station is not None:
-        db_entry.station = _checked_rel(db, Station, entry_update.station.id)
+        db_entry.station_id = entry_update.station.id
     if entry_update.ore is not None:
-        db_entry.ore = _checked_rel(db, Ore, entry_update.ore.id)
+        db_entry.ore_id = entry_update.ore.id
     if entry_update.method is not None:
-        db_entry.method = _checked_rel(db, Method, entry_update.method.id)
+        db_entry.method_id = entry_update.method.id
     if entry_update.quantity is not None:
         db_entry.quantity = entry_update.quantity
     if entry_update.duration is not None:
         db_entry.duration = entry_update.duration
     db.add(db_entry)
     db.commit()
-    db.refresh(db_mining_session)
-    return db_mining_session
+    return db_entry
 
 
-def delete_entry(db: Session, db_mining_session, db_entry: MiningSessionEntry) -> MiningSession:
+def delete_entry(db: Session, db_entry: MiningSessionEntry) -> None:
     db.delete(db_entry)
     db.commit()
-    db.refresh(db_mining_session)
-    return db_mining_session
 
 
-def _checked_rel(db: Session, model, rel_id: int):
-    obj = db.query(model).filter(model.id == rel_id).first()
-    if not obj:
-        raise IntegrityError(f"{model.__name__} for id `{rel_id}` not found")
-    return obj
+def _check_rels(db: Session, rels: List[Tuple[Type, int]]) -> None:
+    """
+    Verify all ``(model, id)`` references exist with one statement, a UNION
+    ALL of existence probes. Raises `IntegrityError` for the first missing
+    reference.
+    """
+    if not rels:
+        return
+    probes = [
+        select([literal(index).label("probe")]).where(model.id == rel_id)
+        for index, (model, rel_id) in enumerate(rels)
+    ]
+    found = set(db.execute(union_all(*probes)).scalars())
+    for index, (model, rel_id) in enumerate(rels):
+        if index not in found:
+            raise IntegrityError(f"{model.__name__} for id `{rel_id}` not found")
 
 
 def _round(value: float) -> float:
@@ -3,7 +3,7 @@ Database schema
 """
 
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, Unicode, \
-    DateTime, func, UniqueConstraint, Float, select, and_, Table
+    DateTime, func, UniqueConstraint, Float, select, and_, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship, column_property
@@ -14,10 +14,14 @@ Base = declarative_base()
 
 friendship = Table(
     "friendship", Base.metadata,
-    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
-    Column("friend_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id", ondelete="CASCADE"),
+           primary_key=True),
+    Column("friend_id", Integer, ForeignKey("user.id", ondelete="CASCADE"),
+           primary_key=True),
     Column("created", DateTime, nullable=False, server_default=func.now()),
     Column("confirmed", DateTime, nullable=True),
+    ### reverse lookups, the primary key covers user_id
+    Index("ix_friendship_friend_id", "friend_id"),
 )
 
 friendship_union = select([
@@ -34,6 +38,8 @@ mining_session_user = Table(
            nullable=False, primary_key=True),
     Column("user_id", Integer, ForeignKey("user.id", ondelete="CASCADE"),
            nullable=False, primary_key=True),
+    ### sessions a user is invited to, the primary key covers session_id
+    Index("ix_mining_session_user_user_id", "user_id"),
 )
 
 
@@ -105,6 +111,18 @@ class UserSession(Base):
     user = relationship("User", back_populates="login_sessions")
 
 
+class UserSessionRevocation(Base):
+    """
+    Session tokens of ``user_id`` issued before ``not_before`` are revoked.
+    Without foreign key, so revocations outlive deleted users.
+    """
+    __tablename__ = "user_session_revocation"
+
+    user_id = Column(Integer, nullable=False, primary_key=True,
+                     autoincrement=False)
+    not_before = Column(DateTime, nullable=False)
+
+
 class Station(Base):
     __tablename__ = "station"
 
@@ -153,6 +171,7 @@ class StationOre(Base):
     station = relationship("Station", back_populates="efficiencies")
 
     __table_args__ = (
+        Index("ix_station_ore_ore_id", "ore_id"),
         {
             "sqlite_autoincrement": True
         },
@@ -192,6 +211,7 @@ class MethodOre(Base):
     method = relationship("Method", back_populates="efficiencies")
 
     __table_args__ = (
+        Index("ix_method_ore_ore_id", "ore_id"),
         {
             "sqlite_autoincrement": True
         },
@@ -222,6 +242,7 @@ class MiningSession(Base):
     entries = relationship("MiningSessionEntry", back_populates="session")
 
     __table_args__ = (
+        Index("ix_mining_session_creator_id", "creator_id"),
         {
             "sqlite_autoincrement": True
         },
@@ -275,6 +296,14 @@ class MiningSessionEntry(Base):
         ) * self.ore.sell_price - self.cost
 
     __table_args__ = (
+        ### entries of a session, per user for payouts
+        Index("ix_mining_session_entry_session_id_user_id",
+              "session_id", "user_id"),
+        Index("ix_mining_session_entry_user_id", "user_id"),
+        ### ON DELETE SET NULL of referenced station, ore and method
+        Index("ix_mining_session_entry_station_id", "station_id"),
+        Index("ix_mining_session_entry_ore_id", "ore_id"),
+        Index("ix_mining_session_entry_method_id", "method_id"),
         {
             "sqlite_autoincrement": True
         },
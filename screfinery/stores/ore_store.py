@@ -2,13 +2,16 @@
 CRUD methods for `ore` objects.
 """
 
-from typing import Optional, Tuple, List
+from typing import Optional, Iterable
 
 from sqlalchemy.orm import Session
 
 from screfinery import schema
+from screfinery.errors import IntegrityError
+from screfinery.pagination import Page, paginate
+from screfinery.schema import CountMode
 from screfinery.stores.model import Ore
-from screfinery.util import sa_filter_from_dict, sa_order_by_from_dict
+from screfinery.util import sa_filter_from_dict
 
 resource_name = "ore"
 
@@ -17,19 +20,37 @@ def get_by_id(db: Session, ore_id: int) -> Ore:
     return db.query(Ore).filter(Ore.id == ore_id).first()
 
 
+def check_ids_exist(db: Session, ore_ids: Iterable[int]) -> None:
+    """
+    Verify all ``ore_ids`` with one query, raises `IntegrityError` listing
+    every id that does not exist.
+    """
+    ore_ids = set(ore_ids)
+    if not ore_ids:
+        return
+    existing = set(
+        ore_id for ore_id, in db.query(Ore.id).filter(Ore.id.in_(ore_ids))
+    )
+    missing = sorted(ore_ids - existing)
+    if len(missing) == 1:
+        raise IntegrityError(f"Ore with id `{missing[0]}` does not exist")
+    if missing:
+        raise IntegrityError(
+            "Ore with ids "
+            + ", ".join(f"`{ore_id}`" for ore_id in missing)
+            + " do not exist")
+
+
 def list_all(db: Session,
              offset: int = 0, limit: int = None,
-             filter_: dict = None, sort: dict = None) -> Tuple[int, List[Ore]]:
+             filter_: dict = None, sort: dict = None,
+             count: CountMode = CountMode.exact,
+             cursor: Optional[str] = None) -> Page:
     filter_ = sa_filter_from_dict(Ore, filter_)
-    order_by = sa_order_by_from_dict(Ore, sort)
-    return (
-        db.query(Ore).filter(filter_).count(),
+    return paginate(
         db.query(Ore)
-        .filter(filter_)
-        .order_by(*order_by)
-        .offset(offset)
-        .limit(limit)
-        .all()
+        .filter(filter_),
+        Ore, sort, offset, limit, count, cursor
     )
 
 
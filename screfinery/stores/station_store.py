@@ -1,14 +1,16 @@
 """
 CRUD methods for `station` objects.
 """
-from typing import Optional, Tuple, List
+from typing import Optional, List
 
 from sqlalchemy.orm import Session, joinedload
 
 from screfinery import schema
-from screfinery.errors import IntegrityError
-from screfinery.stores.model import Station, StationOre, Ore
-from screfinery.util import sa_filter_from_dict, sa_order_by_from_dict
+from screfinery.pagination import Page, paginate
+from screfinery.schema import CountMode
+from screfinery.stores import ore_store
+from screfinery.stores.model import Station, StationOre
+from screfinery.util import sa_filter_from_dict
 
 resource_name = "station"
 
@@ -17,72 +19,69 @@ def get_by_id(db: Session, station_id: int) -> Station:
     return (
         db.query(Station)
         .filter(Station.id == station_id)
-        .options(joinedload(Station.efficiencies))
+        .options(joinedload(Station.efficiencies).joinedload(StationOre.ore))
         .first()
     )
 
 
 def list_all(db: Session,
              offset: int = 0, limit: int = None,
-             filter_: dict = None, sort: dict = None
-             ) -> Tuple[int, List[Station]]:
+             filter_: dict = None, sort: dict = None,
+             count: CountMode = CountMode.exact,
+             cursor: Optional[str] = None
+             ) -> Page:
     filter_ = sa_filter_from_dict(Station, filter_)
-    order_by = sa_order_by_from_dict(Station, sort)
-    return (
-        db.query(Station).filter(filter_).count(),
-        (
-            db.query(Station)
-            .filter(filter_)
-            .order_by(*order_by)
-            .limit(limit)
-            .offset(offset)
-            .options(joinedload(Station.efficiencies))
-            .all()
-        )
+    return paginate(
+        db.query(Station)
+        .filter(filter_)
+        .options(joinedload(Station.efficiencies).joinedload(StationOre.ore)),
+        Station, sort, offset, limit, count, cursor
     )
 
 
-def _create_checked_station_ore_rel(db: Session, station: Station, efficiency: schema.StationOreEfficiency):
-    ore = db.query(Ore).filter(Ore.id == efficiency.ore_id).first()
-    if ore is None:
-        raise IntegrityError(
-            f"Ore with id `{efficiency.ore_id}` does not exist")
-    return StationOre(
-        station=station,
-        ore=ore,
-        efficiency_bonus=efficiency.efficiency_bonus,
-    )
+def _insert_station_ores(db: Session, station_id: int,
+                          efficiencies: List[schema.StationOreEfficiency]):
+    """
+    Insert `StationOre` rows of ``station_id`` with one bulk insert
+    """
+    db.bulk_insert_mappings(StationOre, [
+        dict(
+            station_id=station_id,
+            ore_id=eff.ore_id,
+            efficiency_bonus=eff.efficiency_bonus,
+        )
+        for eff in efficiencies
+    ])
 
 
 def create_one(db: Session, station: schema.StationCreate) -> Station:
+    ore_store.check_ids_exist(db, (eff.ore_id for eff in station.efficiencies))
     db_station = Station(
         name=station.name
     )
-    db_station.efficiencies = [
-        _create_checked_station_ore_rel(db, db_station, eff)
-        for eff in station.efficiencies
-    ]
     db.add(db_station)
+    db.flush()
+    station_id = db_station.id
+    _insert_station_ores(db, station_id, station.efficiencies)
     db.commit()
-    db.refresh(db_station)
-    return db_station
+    return get_by_id(db, station_id)
 
 
 def update_by_id(db: Session, station_id: int, station: schema.StationUpdate) -> Optional[Station]:
-    db_station = get_by_id(db, station_id)
+    db_station = db.query(Station).filter(Station.id == station_id).first()
     if db_station is None:
         return None
+    if station.efficiencies is not None:
+        ore_store.check_ids_exist(db, (eff.ore_id for eff in station.efficiencies))
     if station.name is not None:
         db_station.name = station.name
-    if station.efficiencies is not None:
-        db_station.efficiencies = [
-            _create_checked_station_ore_rel(db, db_station, eff)
-            for eff in station.efficiencies
-        ]
     db.add(db_station)
+    db.flush()
+    if station.efficiencies is not None:
+        db.query(StationOre).filter(StationOre.station_id == station_id).delete()
+        _insert_station_ores(db, station_id, station.efficiencies)
     db.commit()
-    db.refresh(db_station)
-    return db_station
+    return get_by_id(db, station_id)
 
 
 def delete_by_id(db: Session, station_id: int):
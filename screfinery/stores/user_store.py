@@ -10,13 +10,18 @@ from typing import Optional, List, Tuple
 
 from sqlalchemy.orm import Session, joinedload
 
-from screfinery import schema
-from screfinery.stores.model import User, UserScope, UserSession
-from screfinery.util import hash_password, sa_filter_from_dict, \
-    sa_order_by_from_dict
+from screfinery import schema, session_token
+from screfinery.cache import LRUCache
+from screfinery.pagination import Page, paginate
+from screfinery.schema import CountMode
+from screfinery.stores.model import User, UserScope, UserSession, \
+    UserSessionRevocation
+from screfinery.util import hash_password, sa_filter_from_dict
 
 log = logging.getLogger(__name__)
 resource_name = "user"
+### verified sessions by (user_id, session hash, user ip), see `cache_session`
+session_cache = LRUCache("user_session", maxsize=1024, ttl=60)
 
 
 def get_by_id(db: Session, user_id: int) -> Optional[User]:
@@ -36,20 +41,15 @@ def get_by_ids(db: Session, user_ids: List[int]) -> List[User]:
 
 def list_all(db: Session,
              offset: int = 0, limit: int = None,
-             filter_: dict = None, sort: dict = None) -> Tuple[int, List[User]]:
+             filter_: dict = None, sort: dict = None,
+             count: CountMode = CountMode.exact,
+             cursor: Optional[str] = None) -> Page:
     filter_ = sa_filter_from_dict(User, filter_)
-    order_by = sa_order_by_from_dict(User, sort)
-    return (
-        db.query(User).filter(filter_).count(),
-        (
-            db.query(User)
-            .filter(filter_)
-            .order_by(*order_by)
-            .options(joinedload(User.scopes))
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
+    return paginate(
+        db.query(User)
+        .filter(filter_)
+        .options(joinedload(User.scopes)),
+        User, sort, offset, limit, count, cursor
     )
 
 
@@ -73,7 +73,10 @@ def create_one(db: Session, user: schema.UserCreate, password_salt: str) -> User
 
 def delete_by_id(db: Session, user_id: int):
     db.query(User).filter(User.id == user_id).delete()
+    not_before = revoke_token_sessions(db, user_id)
     db.commit()
+    invalidate_cached_sessions(user_id)
+    session_token.revocations.revoke(user_id, not_before)
 
 
 def update_by_id(db: Session, user_id: int, user: schema.UserUpdate) -> Optional[User]:
@@ -90,7 +93,10 @@ def update_by_id(db: Session, user_id: int, user: schema.UserUpdate) -> Optional
         db_user.is_google = user.is_google
     if user.password:
         db_user.password_hash = user.password
+    not_before = None
     if user.scopes is not None:
+        if set(user.scopes) != set(it.scope for it in db_user.scopes):
+            not_before = revoke_token_sessions(db, user_id)
         db_user.scopes = [
             UserScope(user=db_user, scope=scope)
             for scope in user.scopes
@@ -102,6 +108,9 @@ def update_by_id(db: Session, user_id: int, user: schema.UserUpdate) -> Optional
     log.info(f"Updating user {user}")
     db.add(db_user)
     db.commit()
+    invalidate_cached_sessions(user_id)
+    if not_before is not None:
+        session_token.revocations.revoke(user_id, not_before)
     db.refresh(db_user)
     return db_user
 
@@ -120,6 +129,7 @@ def find_by_credentials(db: Session, mail: str, password_hash: str) -> Optional[
 def delete_sessions(db: Session, user_id: int) -> None:
     db.query(UserSession).filter(UserSession.user_id == user_id).delete()
     db.commit()
+    invalidate_cached_sessions(user_id)
 
 
 def session_hash(user_id, user_ip, salt) -> str:
@@ -134,6 +144,7 @@ def create_session(db: Session, user: User, user_ip: str) -> Tuple[UserSession,
     user_session = UserSession(user=user, user_ip=user_ip, salt=session_salt)
     db.add(user_session)
     db.commit()
+    invalidate_cached_sessions(user.id)
     db.refresh(user_session)
     return user_session, session_hash(user.id, user_ip, session_salt)
 
@@ -156,3 +167,70 @@ def find_session(db: Session, user_id: int) -> Optional[Tuple[UserSession, str]]
 def delete_session(db: Session, session) -> None:
     db.query(UserSession).filter(UserSession.user_id == session.user_id).delete()
     db.commit()
+    invalidate_cached_sessions(session.user_id)
+
+
+def find_cached_session(db: Session, cache_key: tuple) -> Optional[UserSession]:
+    cached_session = session_cache.get(cache_key)
+    if cached_session is None:
+        return None
+    return db.merge(cached_session, load=False)
+
+
+def cache_session(db: Session, cache_key: tuple, session: UserSession) -> UserSession:
+    """
+    Detach a verified session, its user and scopes from ``db`` and keep it in
+    ``session_cache``. The cached instances never get attached to any db
+    session again, every request works on a copy merged into its own session.
+    """
+    db.expunge(session)
+    db.expunge(session.user)
+    session_cache.set(cache_key, session)
+    return db.merge(session, load=False)
+
+
+def invalidate_cached_sessions(user_id: int) -> None:
+    user_id = str(user_id)
+    session_cache.invalidate(lambda cache_key: cache_key[0] == user_id)
+
+
+def create_token_session(db: Session, user: User, user_ip: str,
+                         secret: str, ttl: float) -> str:
+    """
+    Create a signed session token for ``user``, revoking tokens issued to
+    ``user`` before.
+    """
+    now = datetime.utcnow()
+    scopes = [it.scope for it in user.scopes]
+    user.last_login = now
+    revoke_token_sessions(db, user.id, now)
+    db.commit()
+    session_token.revocations.revoke(user.id, now)
+    issued = session_token.timestamp(now)
+    return session_token.encode(secret, user.id, user_ip, scopes,
+                                issued, issued + ttl)
+
+
+def logout_token_session(db: Session, user_id: int) -> None:
+    not_before = revoke_token_sessions(db, user_id)
+    db.commit()
+    session_token.revocations.revoke(user_id, not_before)
+
+
+def revoke_token_sessions(db: Session, user_id: int,
+                          not_before: datetime = None) -> datetime:
+    """
+    Revoke tokens of ``user_id`` issued before ``not_before``, defaults to
+    now. Changes are committed by the caller.
+    """
+    not_before = not_before or datetime.utcnow()
+    db.merge(UserSessionRevocation(user_id=user_id, not_before=not_before))
+    return not_before
+
+
+def find_revocations(db: Session, since: datetime) -> List[Tuple[int, datetime]]:
+    return (
+        db.query(UserSessionRevocation.user_id, UserSessionRevocation.not_before)
+        .filter(UserSessionRevocation.not_before > since)
+        .all()
+    )
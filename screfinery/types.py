@@ -1,7 +1,11 @@
-from typing import Protocol, Type, List, Optional
+from typing import Protocol, Type, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from screfinery.pagination import Page
+from screfinery.schema import CountMode
+
 
 class Store(Protocol):
 
@@ -9,7 +13,8 @@ class Store(Protocol):
         pass
 
     def list_all(self, db: Session, offset: int, limit: int,
-                 filter_: dict, sort: dict) -> List[Type]:
+                 filter_: dict, sort: dict,
+                 count: CountMode, cursor: Optional[str]) -> Page:
         pass
 
     def create_one(self, db: Session, data: Type) -> Optional[Type]:
@@ -21,4 +26,26 @@ class Store(Protocol):
     def delete_by_id(self, db: Session, id: int) -> Optional[Type]:
         pass
 
-    resource_name: str
\ No newline at end of file
+    resource_name: str
+
+
+class AsyncStore(Protocol):
+
+    async def get_by_id(self, db: AsyncSession, id: int) -> Optional[Type]:
+        pass
+
+    async def list_all(self, db: AsyncSession, offset: int, limit: int,
+                       filter_: dict, sort: dict,
+                       count: CountMode, cursor: Optional[str]) -> Page:
+        pass
+
+    async def create_one(self, db: AsyncSession, data: Type) -> Optional[Type]:
+        pass
+
+    async def update_by_id(self, db: AsyncSession, id: int, data: Type) -> Optional[Type]:
+        pass
+
+    async def delete_by_id(self, db: AsyncSession, id: int) -> Optional[Type]:
+        pass
+
+    resource_name: str
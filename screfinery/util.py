@@ -1,9 +1,11 @@
 import logging
-from fnmatch import fnmatch
+import re
+from fnmatch import translate
+from functools import lru_cache
 from hashlib import sha256
-from typing import List
+from typing import List, FrozenSet, Iterable
 
-from sqlalchemy import and_
+from sqlalchemy import and_, event
 
 from screfinery.stores.model import User
 
@@ -45,16 +47,90 @@ def hash_password(salt, value):
     return sha256(hash_value.encode("utf-8")).hexdigest()
 
 
+class PermissionSet:
+    """
+    Scopes compiled for matching ``resource.action`` permissions, with the
+    same results as matching each scope using ``fnmatch``. Exact scopes and
+    wildcards ``*``, ``resource.*`` and ``*.action`` are set lookups, any
+    other pattern falls back to a precompiled regular expression.
+    """
+    __slots__ = ("allow_all", "exact", "resources", "actions", "patterns")
+
+    def __init__(self, scopes: Iterable[str]):
+        self.allow_all = False
+        self.exact = set()
+        self.resources = set()
+        self.actions = set()
+        self.patterns = []
+        for scope in scopes:
+            if scope == "*":
+                self.allow_all = True
+            elif not _has_wildcard(scope):
+                self.exact.add(scope)
+            elif scope.endswith(".*") and _is_plain_name(scope[:-2]):
+                self.resources.add(scope[:-2])
+            elif scope.startswith("*.") and _is_plain_name(scope[2:]):
+                self.actions.add(scope[2:])
+            else:
+                self.patterns.append(re.compile(translate(scope)).match)
+
+    def is_authorized(self, required_scope: str) -> bool:
+        if self.allow_all or required_scope in self.exact:
+            return True
+        resource, sep, _ = required_scope.partition(".")
+        if sep and resource in self.resources:
+            return True
+        _, sep, action = required_scope.rpartition(".")
+        if sep and action in self.actions:
+            return True
+        return any(match(required_scope) for match in self.patterns)
+
+
+def _has_wildcard(scope: str) -> bool:
+    return "*" in scope or "?" in scope or "[" in scope
+
+
+def _is_plain_name(value: str) -> bool:
+    return "." not in value and not _has_wildcard(value)
+
+
+@lru_cache(maxsize=256)
+def compile_permissions(scopes: FrozenSet[str]) -> PermissionSet:
+    return PermissionSet(scopes)
+
+
 def is_authorized(scopes: List[str], required_scope: str) -> bool:
-    return any(
-        fnmatch(required_scope, scope)
-        for scope in scopes
-    )
+    return compile_permissions(frozenset(scopes)).is_authorized(required_scope)
+
+
+def user_permissions(user: User) -> PermissionSet:
+    """
+    Compiled permissions of ``user``, kept on the instance until its scopes
+    are changed or expired.
+    """
+    permissions = getattr(user, "_permissions", None)
+    if permissions is None:
+        permissions = compile_permissions(
+            frozenset(it.scope for it in user.scopes))
+        user._permissions = permissions
+    return permissions
 
 
 def is_user_authorized(user: User, required_scope: str) -> bool:
-    user_scopes = [it.scope for it in user.scopes]
-    return is_authorized(user_scopes, required_scope)
+    return user_permissions(user).is_authorized(required_scope)
+
+
+@event.listens_for(User.scopes, "append")
+@event.listens_for(User.scopes, "remove")
+def _reset_user_permissions(user, *args):
+    user.__dict__.pop("_permissions", None)
+
+
+@event.listens_for(User, "expire", raw=True)
+@event.listens_for(User, "refresh", raw=True)
+def _reset_user_permissions_on_expire(state, *args):
+    ### state.dict is empty when the instance was already garbage collected
+    state.dict.pop("_permissions", None)
 
 
 class obj:
@@ -0,0 +1,22 @@
+from sqlalchemy import inspect
+
+from screfinery import db
+from screfinery.stores.model import MiningSessionEntry
+
+
+def test_create_missing_indexes(tmp_path):
+    config = {"url": f"sqlite:///{tmp_path}/app.db"}
+    engine, _ = db.init(config, create_all=True)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_mining_session_entry_user_id")
+        connection.exec_driver_sql("DROP INDEX ix_friendship_friend_id")
+
+    assert db.create_missing_indexes(config, dry_run=True) == [
+        "ix_friendship_friend_id", "ix_mining_session_entry_user_id"]
+    assert db.create_missing_indexes(config) == [
+        "ix_friendship_friend_id", "ix_mining_session_entry_user_id"]
+    assert db.create_missing_indexes(config) == []
+    index_names = set(
+        it["name"] for it in inspect(engine).get_indexes(
+            MiningSessionEntry.__tablename__))
+    assert "ix_mining_session_entry_user_id" in index_names
@@ -0,0 +1,70 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from screfinery import db
+from screfinery.dependency import use_db
+
+
+def _init_db(path, name):
+    engine, _ = db.init({"url": f"sqlite:///{path}"})
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE origin (name TEXT)"))
+        connection.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+    engine.dispose()
+
+
+def _origin(session):
+    try:
+        return session.execute(text("SELECT name FROM origin")).scalar()
+    finally:
+        session.close()
+
+
+def _init_router(tmp_path, replica_urls):
+    _init_db(tmp_path / "primary.db", "primary")
+    _init_db(tmp_path / "replica.db", "replica")
+    config = {
+        "url": f"sqlite:///{tmp_path}/primary.db",
+        "replicas": replica_urls,
+    }
+    _, session_local = db.init(config)
+    return session_local, db.init_read(config, session_local)
+
+
+def test_reads_round_robin_skip_unavailable(tmp_path):
+    _, router = _init_router(tmp_path, [
+        f"sqlite:///{tmp_path}/replica.db",
+        f"sqlite:///{tmp_path}/missing/replica.db",
+    ])
+    assert [_origin(router()) for _ in range(3)] == ["replica", "replica", "replica"]
+    assert router._down_until[1] > 0
+
+
+def test_reads_fall_back_to_primary(tmp_path):
+    _, router = _init_router(tmp_path, [
+        f"sqlite:///{tmp_path}/missing/replica.db",
+    ])
+    assert _origin(router()) == "primary"
+
+
+def test_use_db_routes_by_method_and_pins_after_write(tmp_path):
+    session_local, router = _init_router(tmp_path, [
+        f"sqlite:///{tmp_path}/replica.db",
+    ])
+    app = FastAPI()
+    app.state.db_session = session_local
+    app.state.db_read_session = router
+
+    @app.get("/origin")
+    @app.post("/origin")
+    def origin(db=Depends(use_db)):
+        return _origin(db)
+
+    client = TestClient(app, base_url="https://testserver")
+    assert client.get("/origin").json() == "replica"
+    assert client.get("/origin", headers={"X-Read-Primary": "1"}).json() == "primary"
+    response = client.post("/origin")
+    assert response.json() == "primary"
+    assert "p" in response.cookies
+    assert client.get("/origin").json() == "primary"
@@ -0,0 +1,21 @@
+from screfinery import db
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine, _ = db.init({
+        "url": f"sqlite:///{tmp_path}/app.db",
+        "sqlite": {"busy_timeout": 1234},
+    })
+    with engine.connect() as connection:
+        pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1
+        assert pragma("temp_store") == 2
+        assert pragma("foreign_keys") == 1
+        assert pragma("busy_timeout") == 1234
+
+
+def test_sqlite_pragmas_omitted_without_section(tmp_path):
+    engine, _ = db.init({"url": f"sqlite:///{tmp_path}/app.db"})
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from screfinery.instrumentation import TimedRoute, instrument_engines
+from screfinery.middleware import ServerTimingMiddleware
+
+
+def test_server_timing_counts_queries():
+    instrument_engines()
+    engine = create_engine("sqlite://")
+    routes = APIRouter(route_class=TimedRoute)
+
+    @routes.get("/queries/{count}")
+    def queries(count: int):
+        with engine.connect() as connection:
+            for _ in range(count):
+                connection.execute(text("SELECT 1"))
+        return {"count": count}
+
+    app = FastAPI()
+    app.include_router(routes)
+    app.add_middleware(ServerTimingMiddleware)
+    client = TestClient(app)
+
+    response = client.get("/queries/3")
+    assert response.json() == {"count": 3}
+    segments = [it.strip() for it in response.headers["server-timing"].split(",")]
+    assert segments[0].startswith("db;dur=")
+    assert segments[0].endswith(';desc="3 queries"')
+    assert segments[1].startswith("app;dur=")
+    assert segments[2].startswith("serialize;dur=")
@@ -0,0 +1,30 @@
+import pytest
+
+from screfinery import db
+from screfinery.errors import IntegrityError
+from screfinery.stores.mining_session_store import _check_rels
+from screfinery.stores.model import Ore, Station, User, Method
+
+
+@pytest.fixture
+def session(tmp_path):
+    _, session_local = db.init({"url": f"sqlite:///{tmp_path}/app.db"}, create_all=True)
+    with session_local() as session:
+        session.add_all([
+            User(id=1, name="a", mail="a@b", password_hash=""),
+            Station(id=1, name="s"),
+            Ore(id=1, name="o"),
+        ])
+        session.commit()
+        yield session
+
+
+def test_check_rels(session):
+    _check_rels(session, [(User, 1), (Station, 1), (Ore, 1)])
+    _check_rels(session, [])
+
+
+def test_check_rels_reports_first_missing(session):
+    with pytest.raises(IntegrityError) as exc_info:
+        _check_rels(session, [(User, 1), (Station, 2), (Ore, 1), (Method, 1)])
+    assert str(exc_info.value) == "Station for id `2` not found"
@@ -0,0 +1,29 @@
+import pytest
+
+from screfinery import db
+from screfinery.errors import IntegrityError
+from screfinery.stores import ore_store
+from screfinery.stores.model import Ore
+
+
+@pytest.fixture
+def session(tmp_path):
+    _, session_local = db.init({"url": f"sqlite:///{tmp_path}/app.db"}, create_all=True)
+    with session_local() as session:
+        session.add_all([Ore(id=1, name="a"), Ore(id=2, name="b")])
+        session.commit()
+        yield session
+
+
+def test_check_ids_exist(session):
+    ore_store.check_ids_exist(session, [1, 2, 2])
+    ore_store.check_ids_exist(session, [])
+
+
+def test_check_ids_exist_reports_all_missing(session):
+    with pytest.raises(IntegrityError) as exc_info:
+        ore_store.check_ids_exist(session, [1, 7, 5])
+    assert str(exc_info.value) == "Ore with ids `5`, `7` do not exist"
+    with pytest.raises(IntegrityError) as exc_info:
+        ore_store.check_ids_exist(session, [3])
+    assert str(exc_info.value) == "Ore with id `3` does not exist"
@@ -0,0 +1,71 @@
+import pytest
+
+from screfinery import db, pagination
+from screfinery.errors import IntegrityError
+from screfinery.schema import CountMode
+from screfinery.stores import station_store
+from screfinery.stores.model import Ore, Station, StationOre
+
+
+@pytest.fixture
+def session(tmp_path):
+    _, session_local = db.init({"url": f"sqlite:///{tmp_path}/app.db"}, create_all=True)
+    with session_local() as session:
+        ores = [Ore(name=f"ore {i}") for i in range(3)]
+        for i in range(30):
+            session.add(Station(name=f"station {i:02}", efficiencies=[
+                StationOre(ore=ore, efficiency_bonus=0.1) for ore in ores
+            ]))
+        session.commit()
+        yield session
+
+
+def test_exact_count_ignores_eager_joined_rows(session):
+    total_count, items, _ = station_store.list_all(session, 5, 10, {}, {"name": "asc"})
+    assert total_count == 30
+    assert [it.name for it in items] == [f"station {i:02}" for i in range(5, 15)]
+    assert all(len(it.efficiencies) == 3 for it in items)
+
+    total_count, items, _ = station_store.list_all(session, 0, None, {"name": "station 1"}, {})
+    assert total_count == 10
+    assert len(items) == 10
+
+
+def test_count_past_last_page(session):
+    assert station_store.list_all(session, 40, 10, {}, {}) == (30, [], None)
+
+
+def test_count_modes(session, monkeypatch):
+    total_count, items, _ = station_store.list_all(session, 0, 2, {}, {}, CountMode.none)
+    assert total_count is None
+    assert len(items) == 2
+
+    monkeypatch.setattr(pagination, "ESTIMATE_PAGES", 5)
+    total_count, items, _ = station_store.list_all(session, 0, 2, {}, {}, CountMode.estimate)
+    assert total_count == 10
+    total_count, items, _ = station_store.list_all(session, 20, 2, {}, {}, CountMode.estimate)
+    assert total_count == 30
+
+
+def test_cursor_pages(session):
+    names = []
+    page = station_store.list_all(session, 0, 7, {}, {"updated": "desc"},
+                                  CountMode.none)
+    names.extend(it.name for it in page.items)
+    while page.next_cursor is not None:
+        page = station_store.list_all(session, 0, 7, {}, {"updated": "desc"},
+                                      CountMode.none, page.next_cursor)
+        names.extend(it.name for it in page.items)
+    ### all stations share one timestamp, pages are ordered by id
+    assert names == [f"station {i:02}" for i in range(30)]
+
+
+def test_cursor_requires_matching_sort(session):
+    page = station_store.list_all(session, 0, 5, {}, {"name": "asc"})
+    assert page.total_count == 30
+    with pytest.raises(IntegrityError):
+        station_store.list_all(session, 0, 5, {}, {"name": "desc"},
+                               cursor=page.next_cursor)
+    with pytest.raises(IntegrityError):
+        station_store.list_all(session, 0, 5, {}, {"name": "asc"},
+                               cursor="garbage")
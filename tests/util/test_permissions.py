@@ -0,0 +1,50 @@
+from fnmatch import fnmatch
+from itertools import product
+
+from screfinery.util import PermissionSet, compile_permissions, is_authorized
+
+SCOPES = [
+    "*",
+    "user.read",
+    "user.*",
+    "*.read",
+    "mining_session.*",
+    "mining_*.list",
+    "?re.read",
+    "[os]*.create",
+    "a.b.*",
+    "*.b.c",
+]
+REQUIRED_SCOPES = [
+    "user.read",
+    "user.update",
+    "ore.read",
+    "ore.create",
+    "station.create",
+    "mining_session.delete",
+    "mining_session.list",
+    "method.list",
+    "a.b.c",
+    "user",
+    "read",
+]
+
+
+def test_permission_set_matches_fnmatch_for_single_scopes():
+    for scope, required_scope in product(SCOPES, REQUIRED_SCOPES):
+        expected = fnmatch(required_scope, scope)
+        result = PermissionSet([scope]).is_authorized(required_scope)
+        assert result == expected, (scope, required_scope)
+
+
+def test_permission_set_matches_fnmatch_for_scope_combinations():
+    for scopes in product(SCOPES[1:], SCOPES[1:]):
+        for required_scope in REQUIRED_SCOPES:
+            expected = any(fnmatch(required_scope, scope) for scope in scopes)
+            assert is_authorized(list(scopes), required_scope) == expected, \
+                (scopes, required_scope)
+
+
+def test_compile_permissions_is_memoized():
+    scopes = frozenset(["user.read", "ore.*"])
+    assert compile_permissions(scopes) is compile_permissions(frozenset(scopes))